@@ -1,34 +1,100 @@
+import hashlib
+import inspect
 import json
 import os
+import pathlib
 import sys
 
+# orjson (extension C) si disponible, sinon json standard
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None  # type: ignore
+    ORJSON_AVAILABLE = False
+
 # S'assurer que le dossier courant est dans le PYTHONPATH
 sys.path.insert(0, os.path.dirname(__file__))
 
 from prompt_transformer import build_prompt_from_profiles
 from enhanced_ui_generator import generate_content
 
-profiles = {"VARK": "V", "MBTI": "INTJ"}
+# Cache disque des sorties (prompt + contenu), indexé par le hash des entrées et du code
+CACHE_DIR = os.path.join(os.path.dirname(__file__), ".prompt_cache")
+# À incrémenter quand le format des entrées du cache change
+CACHE_VERSION = 1
+# Désactivé par PROMPT_CACHE=0 ou --no-cache ; désactivé par défaut en CI (variable CI définie)
+USE_CACHE = (
+    os.environ.get("PROMPT_CACHE", "0" if os.environ.get("CI") else "1") != "0"
+    and "--no-cache" not in sys.argv
+)
+
+
+def _code_version():
+    # Empreinte des sources du prompt et du générateur : toute modification invalide le cache
+    h = hashlib.blake2b(str(CACHE_VERSION).encode(), digest_size=16)
+    for fn in (build_prompt_from_profiles, generate_content):
+        h.update(pathlib.Path(inspect.getsourcefile(fn)).read_bytes())
+    return h.hexdigest()
+
+
+def _cache_key(inputs):
+    payload = json.dumps([_code_version(), inputs], sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def build_and_generate(**inputs):
+    """build_prompt_from_profiles + generate_content, mémoïsés sur disque (sauf si USE_CACHE est faux)."""
+    if not USE_CACHE:
+        prompt = build_prompt_from_profiles(**inputs)
+        return prompt, generate_content(prompt)
+
+    path = os.path.join(CACHE_DIR, f"{_cache_key(inputs)}.json")
+    if os.path.exists(path):
+        if ORJSON_AVAILABLE:
+            cached = orjson.loads(pathlib.Path(path).read_bytes())
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        return cached["prompt"], cached["content"]
+
+    prompt = build_prompt_from_profiles(**inputs)
+    content = generate_content(prompt)
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    if ORJSON_AVAILABLE:
+        pathlib.Path(path).write_bytes(
+            orjson.dumps({"prompt": prompt, "content": content}, option=orjson.OPT_NON_STR_KEYS)
+        )
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"prompt": prompt, "content": content}, f, ensure_ascii=False)
+    return prompt, content
+
+
 features = {"ls_visual": 0.7, "pers_intuition": 0.8}
 ui = {"layout": "cards", "verbosity": "compact"}
 
-prompt = build_prompt_from_profiles(
+prompt, content = build_and_generate(
     goal="Expliquer Gradient Descent",
     lang="fr",
     level="L3",
-    profiles=profiles,
+    vark_label="V",
+    mbti_label="INTJ",
     features=features,
     ui=ui
 )
 
-content = generate_content(prompt)
-
 print("\n== CLEFS ==")
 print(list(content.keys()))
 
 print("\n== UI CONFIG ==")
 print(json.dumps(content["ui_config"], indent=2, ensure_ascii=False))
 
-with open("ui_config_sample.json", "w", encoding="utf-8") as f:
-    json.dump(content, f, indent=2, ensure_ascii=False)
+if ORJSON_AVAILABLE:
+    with open("ui_config_sample.json", "wb") as f:
+        f.write(orjson.dumps(content, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+else:
+    with open("ui_config_sample.json", "w", encoding="utf-8") as f:
+        json.dump(content, f, indent=2, ensure_ascii=False)
 print("\nFichier écrit: ui_config_sample.json")
@@ -3,214 +3,330 @@ Test simplifié du système unifié sans dépendances lourdes.
 """
 
 import json
-import pandas as pd
-from datetime import datetime, timedelta
+import pathlib
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from datetime import datetime
+from functools import lru_cache
 import sys
 import os
 
+# orjson (extension C) si disponible, sinon json standard
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None  # type: ignore
+    ORJSON_AVAILABLE = False
+
 # Ajouter le chemin du projet
 sys.path.insert(0, os.path.dirname(__file__))
 
-from src.models.profile_generator import ProfileGenerator
+from src.models.profile_generator import (
+    LEARNING_STYLE_FIELDS,
+    PERSONALITY_FIELDS,
+    BehavioralProfile,
+    CognitiveProfile,
+    LearnerProfile,
+    LearningStyle,
+    PersonalityProfile,
+    ProfileGenerator,
+)
 from src.prompt_transformer import PromptTransformer
 
+# Conversations de test figées (horodatages fixes)
+FIXTURES_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "conversations.json")
+
+# Tampon d'écriture des fichiers de résultats (1 Mo)
+_WRITE_BUFFER_SIZE = 1 << 20
+
+# Ordre des styles VARK (pour l'argmax)
+_STYLES = LEARNING_STYLE_FIELDS
+
+# Préfixes des lignes de validation
+_OK = "  ✓ "
+_WARN = "  ⚠ "
+
+# Valeurs de part et d'autre des seuils des règles du prompt (0.3, 0.4, 0.5, 0.6, 0.7)
+_BOUNDARY_VALUES = (0.296, 0.3, 0.304, 0.396, 0.4, 0.404, 0.496, 0.5, 0.504, 0.596, 0.6, 0.604, 0.696, 0.7, 0.704)
+
+# Mots signalant des difficultés liées à la demande d'aide
+_WORD_RE = re.compile(r"\w+")
+_HELP_TOKENS = frozenset({"aide", "hésitation"})
+
+# Composants partagés par tous les tests (construits une seule fois)
+_PROFILE_GENERATOR = ProfileGenerator()
+_TRANSFORMER = PromptTransformer()
+
+
+def _read_json(path):
+    """Lit un fichier JSON"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(pathlib.Path(path).read_bytes())
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _emit(lines):
+    """Écrit toute la sortie d'un test en un seul appel"""
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+def _parallel_map(fn, items):
+    """
+    Applique fn à chaque élément dans un pool de processus (les profils sont
+    indépendants). fn doit être une fonction de module (sérialisable) et ne
+    pas dépendre d'un état partagé : le parent réintègre ses résultats.
+    """
+    items = list(items)
+    workers = min(len(items), os.cpu_count() or 1)
+    if workers <= 1:
+        return [fn(item) for item in items]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(fn, items))
+
+
+def _json_default(obj):
+    """Sérialise les datetime (orjson les gère nativement)"""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Type non sérialisable: {type(obj).__name__}")
+
+
+def _write_json(path, obj):
+    """
+    Écrit obj dans un fichier JSON compact, en une seule écriture binaire.
+    Pour une lecture humaine : jq . test_result_<profil>.json
+    """
+    if ORJSON_AVAILABLE:
+        data = orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    else:
+        data = json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_json_default).encode("utf-8")
+    with open(path, "wb", buffering=_WRITE_BUFFER_SIZE) as f:
+        f.write(data)
+
+
+@lru_cache(maxsize=1)
+def _load_conversation_fixtures():
+    """Charge une seule fois les conversations de test depuis fixtures/conversations.json"""
+    return _read_json(FIXTURES_PATH)
+
 
 def create_test_conversation_data():
     """Crée des données de conversation de test"""
     
-    # Conversation d'un apprenant visuel et extraverti
-    visual_extrovert_data = [
-        {
-            "user_input": "Bonjour, pouvez-vous me montrer un schéma de ce concept ?",
-            "bot_response": "Bien sûr, voici un diagramme explicatif...",
-            "timestamp": (datetime.now() - timedelta(minutes=10)).isoformat(),
-            "session_id": "visual_extrovert_001"
-        },
-        {
-            "user_input": "C'est parfait ! J'aimerais partager cela avec mon équipe. Avez-vous d'autres images ?",
-            "bot_response": "Voici quelques visualisations supplémentaires...",
-            "timestamp": (datetime.now() - timedelta(minutes=8)).isoformat(),
-            "session_id": "visual_extrovert_001"
-        },
-        {
-            "user_input": "Excellent ! Pouvons-nous collaborer sur un projet ensemble ?",
-            "bot_response": "Certainement, nous pouvons organiser une session collaborative...",
-            "timestamp": (datetime.now() - timedelta(minutes=6)).isoformat(),
-            "session_id": "visual_extrovert_001"
-        },
-        {
-            "user_input": "Je vois bien le concept maintenant. Merci pour les graphiques colorés !",
-            "bot_response": "Je suis ravi que les visualisations vous aient aidé...",
-            "timestamp": (datetime.now() - timedelta(minutes=4)).isoformat(),
-            "session_id": "visual_extrovert_001"
-        }
-    ]
-    
-    # Conversation d'un apprenant kinesthésique avec difficultés
-    kinesthetic_struggling_data = [
-        {
-            "user_input": "Euh... je ne comprends pas bien. Puis-je essayer de faire quelque chose ?",
-            "bot_response": "Bien sûr, voici un exercice pratique...",
-            "timestamp": (datetime.now() - timedelta(minutes=15)).isoformat(),
-            "session_id": "kinesthetic_struggle_002"
-        },
-        {
-            "user_input": "Hmm... pouvez-vous m'aider ? Je n'arrive pas à manipuler cet élément.",
-            "bot_response": "Je vais vous guider étape par étape...",
-            "timestamp": (datetime.now() - timedelta(minutes=12)).isoformat(),
-            "session_id": "kinesthetic_struggle_002"
-        },
-        {
-            "user_input": "Aidez-moi s'il vous plaît, je suis perdu. Comment faire cette action ?",
-            "bot_response": "Pas de problème, essayons une approche différente...",
-            "timestamp": (datetime.now() - timedelta(minutes=10)).isoformat(),
-            "session_id": "kinesthetic_struggle_002"
-        },
-        {
-            "user_input": "Euh... je pense que je commence à comprendre en pratiquant.",
-            "bot_response": "C'est parfait ! La pratique est la clé...",
-            "timestamp": (datetime.now() - timedelta(minutes=8)).isoformat(),
-            "session_id": "kinesthetic_struggle_002"
-        },
-        {
-            "user_input": "Pouvez-vous m'expliquer encore ? Je veux être sûr de bien faire.",
-            "bot_response": "Bien sûr, reprenons ensemble...",
-            "timestamp": (datetime.now() - timedelta(minutes=5)).isoformat(),
-            "session_id": "kinesthetic_struggle_002"
-        }
-    ]
-    
-    return {
-        "visual_extrovert": visual_extrovert_data,
-        "kinesthetic_struggling": kinesthetic_struggling_data
-    }
+    # Apprenant visuel et extraverti / apprenant kinesthésique avec difficultés
+    return _load_conversation_fixtures()
 
 
 def test_profile_generation():
     """Test la génération de profils d'apprenants"""
+    log = []
     
-    print("=== Test de Génération de Profils ===")
+    log.append("=== Test de Génération de Profils ===")
     
     # Créer les données de test
     test_data = create_test_conversation_data()
     
-    # Initialiser le générateur de profils
-    profile_generator = ProfileGenerator()
+    # Profils calculés en parallèle, puis fusionnés dans le cache du générateur partagé (ordre d'entrée)
+    profiles = [
+        _PROFILE_GENERATOR.merge_into_cache(profile)
+        for profile in _parallel_map(_generate_profile, test_data.values())
+    ]
     
     results = {}
     
-    for profile_type, conversation_data in test_data.items():
-        print(f"\nTest du profil: {profile_type}")
-        
-        # Convertir en DataFrame
-        df = pd.DataFrame(conversation_data)
-        
-        # Générer le profil
-        profile = profile_generator.generate_profile(df)
+    for profile_type, profile in zip(test_data, profiles):
+        log.append(f"\nTest du profil: {profile_type}")
         
         # Afficher les résultats
-        print(f"  Learner ID: {profile.learner_id}")
-        print(f"  Style d'apprentissage dominant: {_get_dominant_learning_style(profile.learning_style)}")
-        print(f"  Traits de personnalité: Extraversion={profile.personality.extraversion:.2f}, Analytique={profile.personality.thinking:.2f}")
-        print(f"  Niveau de confiance: {profile.confidence_level:.2f}")
-        print(f"  Forces: {profile.strengths}")
-        print(f"  Difficultés: {profile.difficulty_areas}")
+        log.append(f"  Learner ID: {profile.learner_id}")
+        log.append(f"  Style d'apprentissage dominant: {_get_dominant_learning_style(profile.learning_style)}")
+        log.append(f"  Traits de personnalité: Extraversion={profile.personality.extraversion:.2f}, Analytique={profile.personality.thinking:.2f}")
+        log.append(f"  Niveau de confiance: {profile.confidence_level:.2f}")
+        log.append(f"  Forces: {profile.strengths}")
+        log.append(f"  Difficultés: {profile.difficulty_areas}")
         
         results[profile_type] = profile
     
+    _emit(log)
     return results
 
 
+class _RecordsFrame:
+    """Double minimal d'un DataFrame polars : seule la méthode to_dicts est utilisée"""
+
+    def __init__(self, records):
+        self._records = records
+
+    def to_dicts(self):
+        return list(self._records)
+
+
+def test_generate_profile_to_dicts():
+    """generate_profile sur un objet à to_dicts (polars) doit donner le profil des enregistrements bruts"""
+    log = []
+    
+    log.append("\n=== Test de generate_profile (frame polars / to_dicts) ===")
+    
+    for profile_type, conversation_data in create_test_conversation_data().items():
+        # Générateurs neufs : pas de fusion avec un profil déjà en cache
+        from_frame = asdict(ProfileGenerator().generate_profile(_RecordsFrame(conversation_data)))
+        from_records = asdict(ProfileGenerator().generate_profile_from_records(conversation_data))
+        from_frame.pop("last_updated")
+        from_records.pop("last_updated")
+        log.append((
+            f"  ✗ {profile_type}: profil via to_dicts différent du profil direct",
+            f"{_OK}{profile_type}: profil via to_dicts identique au profil direct",
+        )[from_frame == from_records])
+    
+    _emit(log)
+
+
 def test_prompt_transformation(profiles):
     """Test la transformation de profils en prompts"""
+    log = []
     
-    print("\n=== Test de Transformation en Prompts ===")
+    log.append("\n=== Test de Transformation en Prompts ===")
     
-    prompt_transformer = PromptTransformer()
+    # Générer prompts et recommandations en parallèle
+    transformed = _parallel_map(_transform_profile, profiles.values())
     
-    for profile_type, profile in profiles.items():
-        print(f"\nTransformation du profil: {profile_type}")
-        
-        # Générer le prompt
-        prompt = prompt_transformer.profile_to_prompt(profile)
-        print(f"  Prompt généré: {prompt}")
-        
-        # Générer les recommandations
-        recommendations = prompt_transformer.generate_ui_recommendations(profile)
-        print(f"  Thème recommandé: {recommendations['theme_preference']}")
-        print(f"  Suggestions de layout: {recommendations['layout_suggestions'][:3] if len(recommendations['layout_suggestions']) > 3 else recommendations['layout_suggestions']}")
-        print(f"  Style de navigation: {recommendations['navigation_style']}")
+    results = {}
+    
+    for (profile_type, profile), (prompt, recommendations) in zip(profiles.items(), transformed):
+        log.append(f"\nTransformation du profil: {profile_type}")
+        log.append(f"  Prompt généré: {prompt}")
+        log.append(f"  Thème recommandé: {recommendations['theme_preference']}")
+        log.append(f"  Suggestions de layout: {recommendations['layout_suggestions'][:3] if len(recommendations['layout_suggestions']) > 3 else recommendations['layout_suggestions']}")
+        log.append(f"  Style de navigation: {recommendations['navigation_style']}")
         
-        # Sauvegarder les résultats
-        result = {
-            "profile": _profile_to_dict(profile),
+        # Conserver les résultats en mémoire (sauvegardés après la génération UI)
+        results[profile_type] = {
+            "profile": asdict(profile),
             "prompt": prompt,
             "recommendations": recommendations
         }
-        
-        with open(f"test_result_{profile_type}.json", "w", encoding="utf-8") as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
-        
-        print(f"  ✓ Résultats sauvegardés dans test_result_{profile_type}.json")
+    
+    _emit(log)
+    return results
+
+
+def _boundary_profiles():
+    """Profils dont tous les scores valent une même valeur de _BOUNDARY_VALUES, plus un profil mixte"""
+    for v in _BOUNDARY_VALUES:
+        yield LearnerProfile(
+            learner_id=f"seuil_{v}",
+            learning_style=LearningStyle(v, v, v, v),
+            personality=PersonalityProfile(v, v, v, v),
+            cognitive=CognitiveProfile(v, v, v, v, v),
+            behavioral=BehavioralProfile(v, v, v, v, v),
+            confidence_level=v,
+        )
+    mixed = LearnerProfile(learner_id="seuil_mixte")
+    mixed.learning_style = LearningStyle(visual=0.504, auditory=0.2, reading=0.2, kinesthetic=0.096)
+    mixed.personality.extraversion = 0.604
+    mixed.personality.thinking = 0.396
+    yield mixed
+
+
+def test_render_cache_boundaries():
+    """Le rendu mémoïsé (profile_to_prompt, generate_ui_recommendations) doit égaler le rendu direct aux seuils"""
+    log = []
+    
+    log.append("\n=== Test du Cache de Rendu aux Seuils ===")
+    
+    mismatches = []
+    for profile in _boundary_profiles():
+        expected = (_TRANSFORMER._render_prompt(profile), _TRANSFORMER._render_recommendations(profile))
+        # Deux passages : le premier remplit le cache, le second le lit
+        for _ in range(2):
+            if (_TRANSFORMER.profile_to_prompt(profile), _TRANSFORMER.generate_ui_recommendations(profile)) != expected:
+                mismatches.append(profile.learner_id)
+                break
+    
+    log.append((
+        f"  ✗ Rendu en cache différent du rendu direct: {mismatches}",
+        f"{_OK}Rendu en cache identique au rendu direct ({len(_BOUNDARY_VALUES) + 1} profils aux seuils)",
+    )[not mismatches])
+    
+    _emit(log)
+
+
+def _validate_numeric(profile):
+    """
+    Contrôles numériques d'un profil : somme des styles VARK,
+    normalisation (tolérance 10%) et traits de personnalité dans [0, 1].
+    """
+    total = sum(getattr(profile.learning_style, style) for style in _STYLES)
+    pers_ok = all(0.0 <= getattr(profile.personality, trait) <= 1.0 for trait in PERSONALITY_FIELDS)
+    return total, abs(total - 1.0) < 0.1, pers_ok
 
 
 def validate_profile_quality(profiles):
     """Valide la qualité des profils générés"""
+    log = []
     
-    print("\n=== Validation de la Qualité des Profils ===")
+    log.append("\n=== Validation de la Qualité des Profils ===")
     
     for profile_type, profile in profiles.items():
-        print(f"\nValidation du profil: {profile_type}")
+        log.append(f"\nValidation du profil: {profile_type}")
         
-        # Vérifier la cohérence du style d'apprentissage
+        total, style_ok, pers_ok = _validate_numeric(profile)
+        
+        # Chaque contrôle choisit son message par indexation (WARN, OK)[cond]
         learning_style = profile.learning_style
-        total_style = learning_style.visual + learning_style.auditory + learning_style.reading + learning_style.kinesthetic
+        personality = profile.personality
         
-        if abs(total_style - 1.0) < 0.1:  # Tolérance de 10%
-            print("  ✓ Styles d'apprentissage normalisés correctement")
-        else:
-            print(f"  ⚠ Styles d'apprentissage non normalisés: total = {total_style:.2f}")
+        # Vérifier la cohérence du style d'apprentissage
+        log.append((
+            f"{_WARN}Styles d'apprentissage non normalisés: total = {total:.2f}",
+            f"{_OK}Styles d'apprentissage normalisés correctement",
+        )[style_ok])
         
         # Vérifier les traits de personnalité
-        personality = profile.personality
-        if all(0 <= trait <= 1 for trait in [personality.extraversion, personality.intuition, personality.thinking, personality.judging]):
-            print("  ✓ Traits de personnalité dans les limites valides")
-        else:
-            print("  ⚠ Certains traits de personnalité hors limites")
+        log.append((
+            f"{_WARN}Certains traits de personnalité hors limites",
+            f"{_OK}Traits de personnalité dans les limites valides",
+        )[pers_ok])
         
         # Vérifier la présence de forces et difficultés
-        if profile.strengths:
-            print(f"  ✓ Forces identifiées: {len(profile.strengths)} éléments")
-        else:
-            print("  ⚠ Aucune force identifiée")
+        log.append((
+            f"{_WARN}Aucune force identifiée",
+            f"{_OK}Forces identifiées: {len(profile.strengths)} éléments",
+        )[bool(profile.strengths)])
         
-        if profile.difficulty_areas:
-            print(f"  ✓ Difficultés identifiées: {len(profile.difficulty_areas)} éléments")
-        else:
-            print("  ⚠ Aucune difficulté identifiée")
+        log.append((
+            f"{_WARN}Aucune difficulté identifiée",
+            f"{_OK}Difficultés identifiées: {len(profile.difficulty_areas)} éléments",
+        )[bool(profile.difficulty_areas)])
         
         # Vérifier la cohérence avec les données d'entrée
         if profile_type == "visual_extrovert":
-            if learning_style.visual > 0.3:  # Seuil raisonnable
-                print("  ✓ Style visuel correctement détecté")
-            else:
-                print(f"  ⚠ Style visuel faiblement détecté: {learning_style.visual:.2f}")
+            log.append((
+                f"{_WARN}Style visuel faiblement détecté: {learning_style.visual:.2f}",
+                f"{_OK}Style visuel correctement détecté",
+            )[learning_style.visual > 0.3])  # Seuil raisonnable
             
-            if personality.extraversion > 0.5:
-                print("  ✓ Extraversion correctement détectée")
-            else:
-                print(f"  ⚠ Extraversion faiblement détectée: {personality.extraversion:.2f}")
+            log.append((
+                f"{_WARN}Extraversion faiblement détectée: {personality.extraversion:.2f}",
+                f"{_OK}Extraversion correctement détectée",
+            )[personality.extraversion > 0.5])
         
         elif profile_type == "kinesthetic_struggling":
-            if learning_style.kinesthetic > 0.3:
-                print("  ✓ Style kinesthésique correctement détecté")
-            else:
-                print(f"  ⚠ Style kinesthésique faiblement détecté: {learning_style.kinesthetic:.2f}")
+            log.append((
+                f"{_WARN}Style kinesthésique faiblement détecté: {learning_style.kinesthetic:.2f}",
+                f"{_OK}Style kinesthésique correctement détecté",
+            )[learning_style.kinesthetic > 0.3])
             
-            if "aide" in " ".join(profile.difficulty_areas).lower() or "hésitation" in " ".join(profile.difficulty_areas).lower():
-                print("  ✓ Difficultés liées à la demande d'aide détectées")
-            else:
-                print("  ⚠ Difficultés spécifiques non détectées")
+            tokens = {t for area in profile.difficulty_areas for t in _WORD_RE.findall(area.lower())}
+            log.append((
+                f"{_WARN}Difficultés spécifiques non détectées",
+                f"{_OK}Difficultés liées à la demande d'aide détectées",
+            )[bool(tokens & _HELP_TOKENS)])
+    
+    _emit(log)
 
 
 def create_mock_ui_config(prompt, recommendations):
@@ -255,90 +371,59 @@ def create_mock_ui_config(prompt, recommendations):
     return ui_config
 
 
-def test_mock_ui_generation(profiles):
+def test_mock_ui_generation(profiles, results):
     """Test la génération UI simulée"""
+    log = []
     
-    print("\n=== Test de Génération UI Simulée ===")
+    log.append("\n=== Test de Génération UI Simulée ===")
     
-    prompt_transformer = PromptTransformer()
+    # Générer et sauvegarder les configurations en parallèle
+    items = [(profile_type, results[profile_type]) for profile_type in profiles]
+    ui_configs = _parallel_map(_mock_ui_and_save, items)
     
-    for profile_type, profile in profiles.items():
-        print(f"\nGénération UI simulée pour: {profile_type}")
-        
-        # Générer le prompt et les recommandations
-        prompt = prompt_transformer.profile_to_prompt(profile)
-        recommendations = prompt_transformer.generate_ui_recommendations(profile)
+    for (profile_type, result), ui_config in zip(items, ui_configs):
+        log.append(f"\nGénération UI simulée pour: {profile_type}")
         
-        # Créer une configuration UI simulée
-        ui_config = create_mock_ui_config(prompt, recommendations)
+        log.append(f"  ✓ Configuration UI simulée générée")
+        log.append(f"  Thème: {ui_config['theme']}")
+        log.append(f"  Couleur primaire: {ui_config['colors']['primary']}")
+        log.append(f"  Type de navigation: {ui_config['navigation']['type']}")
+        log.append(f"  Nombre d'interactions: {len(ui_config['interactions'])}")
         
-        print(f"  ✓ Configuration UI simulée générée")
-        print(f"  Thème: {ui_config['theme']}")
-        print(f"  Couleur primaire: {ui_config['colors']['primary']}")
-        print(f"  Type de navigation: {ui_config['navigation']['type']}")
-        print(f"  Nombre d'interactions: {len(ui_config['interactions'])}")
+        result["ui_config"] = ui_config
         
-        # Mettre à jour le fichier de résultats
-        result_file = f"test_result_{profile_type}.json"
-        if os.path.exists(result_file):
-            with open(result_file, "r", encoding="utf-8") as f:
-                result = json.load(f)
-            
-            result["ui_config"] = ui_config
-            
-            with open(result_file, "w", encoding="utf-8") as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
-            
-            print(f"  ✓ Configuration ajoutée à {result_file}")
+        log.append(f"  ✓ Résultats sauvegardés dans test_result_{profile_type}.json")
+    
+    _emit(log)
+
+
+# ---------- Travail par profil (exécuté dans les processus du pool) ----------
+
+def _generate_profile(conversation_data):
+    """
+    Génère le profil d'une conversation avec un générateur construit dans le worker
+    (le cache du parent n'existe pas ici) ; le parent le fusionne via merge_into_cache.
+    """
+    return ProfileGenerator().generate_profile_from_records(conversation_data)
+
+
+def _transform_profile(profile):
+    """Retourne (prompt, recommandations) pour un profil"""
+    return _TRANSFORMER.profile_to_prompt(profile), _TRANSFORMER.generate_ui_recommendations(profile)
+
+
+def _mock_ui_and_save(item):
+    """Crée la configuration UI simulée et sauvegarde les résultats complets en une seule écriture"""
+    profile_type, result = item
+    ui_config = create_mock_ui_config(result["prompt"], result["recommendations"])
+    _write_json(f"test_result_{profile_type}.json", {**result, "ui_config": ui_config})
+    return ui_config
 
 
 def _get_dominant_learning_style(learning_style):
     """Retourne le style d'apprentissage dominant"""
-    styles = {
-        'visual': learning_style.visual,
-        'auditory': learning_style.auditory,
-        'reading': learning_style.reading,
-        'kinesthetic': learning_style.kinesthetic
-    }
-    return max(styles, key=styles.get)
-
-
-def _profile_to_dict(profile):
-    """Convertit un LearnerProfile en dictionnaire"""
-    return {
-        "learner_id": profile.learner_id,
-        "learning_style": {
-            "visual": profile.learning_style.visual,
-            "auditory": profile.learning_style.auditory,
-            "reading": profile.learning_style.reading,
-            "kinesthetic": profile.learning_style.kinesthetic
-        },
-        "personality": {
-            "extraversion": profile.personality.extraversion,
-            "intuition": profile.personality.intuition,
-            "thinking": profile.personality.thinking,
-            "judging": profile.personality.judging
-        },
-        "cognitive": {
-            "processing_speed": profile.cognitive.processing_speed,
-            "working_memory": profile.cognitive.working_memory,
-            "analytical_thinking": profile.cognitive.analytical_thinking,
-            "creative_thinking": profile.cognitive.creative_thinking,
-            "attention_span": profile.cognitive.attention_span
-        },
-        "behavioral": {
-            "engagement_level": profile.behavioral.engagement_level,
-            "persistence": profile.behavioral.persistence,
-            "help_seeking": profile.behavioral.help_seeking,
-            "collaboration_preference": profile.behavioral.collaboration_preference,
-            "self_regulation": profile.behavioral.self_regulation
-        },
-        "strengths": profile.strengths,
-        "difficulty_areas": profile.difficulty_areas,
-        "recommended_strategies": profile.recommended_strategies,
-        "confidence_level": profile.confidence_level,
-        "last_updated": profile.last_updated.isoformat()
-    }
+    # Premier maximum, dans l'ordre VARK
+    return max(_STYLES, key=lambda style: getattr(learning_style, style))
 
 
 def main():
@@ -351,14 +436,20 @@ def main():
         # Test 1: Génération de profils
         profiles = test_profile_generation()
         
+        # Test 1 bis: Entrée tabulaire polars (to_dicts)
+        test_generate_profile_to_dicts()
+        
         # Test 2: Transformation en prompts
-        test_prompt_transformation(profiles)
+        results = test_prompt_transformation(profiles)
+        
+        # Test 2 bis: Cache de rendu aux seuils
+        test_render_cache_boundaries()
         
         # Test 3: Validation de la qualité des profils
         validate_profile_quality(profiles)
         
         # Test 4: Génération UI simulée
-        test_mock_ui_generation(profiles)
+        test_mock_ui_generation(profiles, results)
         
         print("\n" + "=" * 60)
         print("Tests simplifiés terminés avec succès !")
@@ -4,10 +4,22 @@ Script de test pour valider le système unifié de profilage d'apprenants et de
 
 import json
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
 from datetime import datetime, timedelta
+from functools import lru_cache
+from operator import itemgetter
 import sys
 import os
 
+# orjson (extension C) si disponible, sinon json standard
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None  # type: ignore
+    ORJSON_AVAILABLE = False
+
 # Ajouter le chemin du projet
 sys.path.insert(0, os.path.dirname(__file__))
 
@@ -15,34 +27,71 @@ from src.models.profile_generator import ProfileGenerator
 from src.prompt_transformer import PromptTransformer
 from src.enhanced_ui_generator import EnhancedUIGenerator
 
+@lru_cache(maxsize=None)
+def get_ui_generator(model_type="t5", model_name="t5-small"):
+    """Retourne un EnhancedUIGenerator partagé (poids chargés une seule fois par session)"""
+    return EnhancedUIGenerator(model_type=model_type, model_name=model_name)
+
+
+def _json_default(obj):
+    """Sérialise les datetime (orjson les gère nativement)"""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Type non sérialisable: {type(obj).__name__}")
+
+
+def _write_json(path, obj):
+    """Écrit obj dans un fichier JSON indenté, en une seule écriture binaire"""
+    if ORJSON_AVAILABLE:
+        data = orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    else:
+        data = json.dumps(obj, indent=2, ensure_ascii=False, default=_json_default).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+# Écritures disque des résultats en arrière-plan (ne bloquent pas la validation)
+_IO_EXECUTOR = ThreadPoolExecutor(max_workers=1)
+
 
+# Décalages temporels des conversations de test (immuables, construits une fois)
+_TIMEDELTAS = {m: timedelta(minutes=m) for m in (4, 5, 6, 8, 10, 12, 15, 18, 20)}
+
+
+@lru_cache(maxsize=1)
 def create_test_conversation_data():
-    """Crée des données de conversation de test"""
+    """Crée des données de conversation de test (construites une seule fois, horodatages cohérents)"""
+    
+    # Une seule lecture de l'horloge pour toutes les conversations
+    now = datetime.now()
+    
+    def ts(minutes):
+        return (now - _TIMEDELTAS[minutes]).isoformat()
     
     # Conversation d'un apprenant visuel et extraverti
     visual_extrovert_data = [
         {
             "user_input": "Bonjour, pouvez-vous me montrer un schéma de ce concept ?",
             "bot_response": "Bien sûr, voici un diagramme explicatif...",
-            "timestamp": (datetime.now() - timedelta(minutes=10)).isoformat(),
+            "timestamp": ts(10),
             "session_id": "visual_extrovert_001"
         },
         {
             "user_input": "C'est parfait ! J'aimerais partager cela avec mon équipe. Avez-vous d'autres images ?",
             "bot_response": "Voici quelques visualisations supplémentaires...",
-            "timestamp": (datetime.now() - timedelta(minutes=8)).isoformat(),
+            "timestamp": ts(8),
             "session_id": "visual_extrovert_001"
         },
         {
             "user_input": "Excellent ! Pouvons-nous collaborer sur un projet ensemble ?",
             "bot_response": "Certainement, nous pouvons organiser une session collaborative...",
-            "timestamp": (datetime.now() - timedelta(minutes=6)).isoformat(),
+            "timestamp": ts(6),
             "session_id": "visual_extrovert_001"
         },
         {
             "user_input": "Je vois bien le concept maintenant. Merci pour les graphiques colorés !",
             "bot_response": "Je suis ravi que les visualisations vous aient aidé...",
-            "timestamp": (datetime.now() - timedelta(minutes=4)).isoformat(),
+            "timestamp": ts(4),
             "session_id": "visual_extrovert_001"
         }
     ]
@@ -52,31 +101,31 @@ def create_test_conversation_data():
         {
             "user_input": "Euh... je ne comprends pas bien. Puis-je essayer de faire quelque chose ?",
             "bot_response": "Bien sûr, voici un exercice pratique...",
-            "timestamp": (datetime.now() - timedelta(minutes=15)).isoformat(),
+            "timestamp": ts(15),
             "session_id": "kinesthetic_struggle_002"
         },
         {
             "user_input": "Hmm... pouvez-vous m'aider ? Je n'arrive pas à manipuler cet élément.",
             "bot_response": "Je vais vous guider étape par étape...",
-            "timestamp": (datetime.now() - timedelta(minutes=12)).isoformat(),
+            "timestamp": ts(12),
             "session_id": "kinesthetic_struggle_002"
         },
         {
             "user_input": "Aidez-moi s'il vous plaît, je suis perdu. Comment faire cette action ?",
             "bot_response": "Pas de problème, essayons une approche différente...",
-            "timestamp": (datetime.now() - timedelta(minutes=10)).isoformat(),
+            "timestamp": ts(10),
             "session_id": "kinesthetic_struggle_002"
         },
         {
             "user_input": "Euh... je pense que je commence à comprendre en pratiquant.",
             "bot_response": "C'est parfait ! La pratique est la clé...",
-            "timestamp": (datetime.now() - timedelta(minutes=8)).isoformat(),
+            "timestamp": ts(8),
             "session_id": "kinesthetic_struggle_002"
         },
         {
             "user_input": "Pouvez-vous m'expliquer encore ? Je veux être sûr de bien faire.",
             "bot_response": "Bien sûr, reprenons ensemble...",
-            "timestamp": (datetime.now() - timedelta(minutes=5)).isoformat(),
+            "timestamp": ts(5),
             "session_id": "kinesthetic_struggle_002"
         }
     ]
@@ -86,25 +135,25 @@ def create_test_conversation_data():
         {
             "user_input": "Pouvez-vous analyser les données de performance et me donner un rapport structuré ?",
             "bot_response": "Voici une analyse détaillée des métriques...",
-            "timestamp": (datetime.now() - timedelta(minutes=20)).isoformat(),
+            "timestamp": ts(20),
             "session_id": "analytical_org_003"
         },
         {
             "user_input": "Excellent. Pouvez-vous organiser ces informations par catégories logiques ?",
             "bot_response": "Voici une classification systématique...",
-            "timestamp": (datetime.now() - timedelta(minutes=18)).isoformat(),
+            "timestamp": ts(18),
             "session_id": "analytical_org_003"
         },
         {
             "user_input": "Je veux comparer ces résultats avec les objectifs planifiés. Avez-vous une méthode ?",
             "bot_response": "Voici une approche méthodologique pour la comparaison...",
-            "timestamp": (datetime.now() - timedelta(minutes=15)).isoformat(),
+            "timestamp": ts(15),
             "session_id": "analytical_org_003"
         },
         {
             "user_input": "Parfait. Je pense que cette approche rationnelle est la meilleure.",
             "bot_response": "Je suis d'accord, cette méthode est très efficace...",
-            "timestamp": (datetime.now() - timedelta(minutes=12)).isoformat(),
+            "timestamp": ts(12),
             "session_id": "analytical_org_003"
         }
     ]
@@ -116,73 +165,92 @@ def create_test_conversation_data():
     }
 
 
-def test_profile_generation():
+@lru_cache(maxsize=1)
+def get_test_dataframes():
+    """Construit une seule fois les DataFrames de conversation (timestamps déjà en datetime64)"""
+    test_dfs = {}
+    for profile_type, conversation_data in create_test_conversation_data().items():
+        df = pd.DataFrame(conversation_data)
+        df["timestamp"] = pd.to_datetime(df["timestamp"], cache=True)
+        test_dfs[profile_type] = df
+    return test_dfs
+
+
+def _run_parallel(fn, items):
+    """Exécute fn sur chaque élément dans un pool de threads, en conservant l'ordre"""
+    items = list(items)
+    if not items:
+        return []
+    with ThreadPoolExecutor(max_workers=min(3, len(items))) as ex:
+        return list(ex.map(fn, items))
+
+
+def _print_lines(lines):
+    """Affiche d'un bloc les lignes produites par un thread (sortie non entrelacée)"""
+    print("\n".join(lines))
+
+
+def test_profile_generation(profile_generator):
     """Test la génération de profils d'apprenants"""
     
     print("=== Test de Génération de Profils ===")
     
-    # Créer les données de test
-    test_data = create_test_conversation_data()
-    
-    # Initialiser le générateur de profils
-    profile_generator = ProfileGenerator()
-    
-    results = {}
-    
-    for profile_type, conversation_data in test_data.items():
-        print(f"\nTest du profil: {profile_type}")
-        
-        # Convertir en DataFrame
-        df = pd.DataFrame(conversation_data)
+    def _process_one(item):
+        profile_type, df = item
+        lines = [f"\nTest du profil: {profile_type}"]
         
         # Générer le profil
         profile = profile_generator.generate_profile(df)
         
         # Afficher les résultats
-        print(f"  Learner ID: {profile.learner_id}")
-        print(f"  Style d'apprentissage dominant: {_get_dominant_learning_style(profile.learning_style)}")
-        print(f"  Traits de personnalité: Extraversion={profile.personality.extraversion:.2f}, Analytique={profile.personality.thinking:.2f}")
-        print(f"  Niveau de confiance: {profile.confidence_level:.2f}")
-        print(f"  Forces: {profile.strengths}")
-        print(f"  Difficultés: {profile.difficulty_areas}")
-        
+        lines.append(f"  Learner ID: {profile.learner_id}")
+        lines.append(f"  Style d'apprentissage dominant: {_get_dominant_learning_style(profile.learning_style)}")
+        lines.append(f"  Traits de personnalité: Extraversion={profile.personality.extraversion:.2f}, Analytique={profile.personality.thinking:.2f}")
+        lines.append(f"  Niveau de confiance: {profile.confidence_level:.2f}")
+        lines.append(f"  Forces: {profile.strengths}")
+        lines.append(f"  Difficultés: {profile.difficulty_areas}")
+        return profile_type, profile, lines
+    
+    results = {}
+    for profile_type, profile, lines in _run_parallel(_process_one, get_test_dataframes().items()):
+        _print_lines(lines)
         results[profile_type] = profile
     
     return results
 
 
-def test_prompt_transformation(profiles):
+def test_prompt_transformation(profiles, prompt_transformer):
     """Test la transformation de profils en prompts"""
     
     print("\n=== Test de Transformation en Prompts ===")
     
-    prompt_transformer = PromptTransformer()
-    
-    for profile_type, profile in profiles.items():
-        print(f"\nTransformation du profil: {profile_type}")
+    def _process_one(item):
+        profile_type, profile = item
+        lines = [f"\nTransformation du profil: {profile_type}"]
         
         # Générer le prompt
         prompt = prompt_transformer.profile_to_prompt(profile)
-        print(f"  Prompt généré: {prompt}")
+        lines.append(f"  Prompt généré: {prompt}")
         
         # Générer les recommandations
         recommendations = prompt_transformer.generate_ui_recommendations(profile)
-        print(f"  Thème recommandé: {recommendations['theme_preference']}")
-        print(f"  Suggestions de layout: {recommendations['layout_suggestions'][:3]}...")  # Afficher les 3 premiers
-        print(f"  Style de navigation: {recommendations['navigation_style']}")
+        lines.append(f"  Thème recommandé: {recommendations['theme_preference']}")
+        lines.append(f"  Suggestions de layout: {recommendations['layout_suggestions'][:3]}...")  # Afficher les 3 premiers
+        lines.append(f"  Style de navigation: {recommendations['navigation_style']}")
+        return lines
+    
+    for lines in _run_parallel(_process_one, profiles.items()):
+        _print_lines(lines)
 
 
-def test_ui_generation(profiles):
+def test_ui_generation(profiles, prompt_transformer, ui_generator):
     """Test la génération de configurations UI"""
     
     print("\n=== Test de Génération UI ===")
     
-    # Initialiser les composants
-    prompt_transformer = PromptTransformer()
-    ui_generator = EnhancedUIGenerator(model_type="t5", model_name="t5-small")
-    
-    for profile_type, profile in profiles.items():
-        print(f"\nGénération UI pour: {profile_type}")
+    def _process_one(item):
+        profile_type, profile = item
+        lines = [f"\nGénération UI pour: {profile_type}"]
         
         try:
             # Générer le prompt et les recommandations
@@ -196,42 +264,40 @@ def test_ui_generation(profiles):
                 temperature=0.5
             )
             
-            print(f"  Configuration générée avec succès")
-            print(f"  Thème: {ui_config.get('theme', 'N/A')}")
-            print(f"  Couleur primaire: {ui_config.get('colors', {}).get('primary', 'N/A')}")
-            print(f"  Type de navigation: {ui_config.get('navigation', {}).get('type', 'N/A')}")
-            print(f"  Interactions: {len(ui_config.get('interactions', []))} éléments")
+            lines.append(f"  Configuration générée avec succès")
+            lines.append(f"  Thème: {ui_config.get('theme', 'N/A')}")
+            lines.append(f"  Couleur primaire: {ui_config.get('colors', {}).get('primary', 'N/A')}")
+            lines.append(f"  Type de navigation: {ui_config.get('navigation', {}).get('type', 'N/A')}")
+            lines.append(f"  Interactions: {len(ui_config.get('interactions', []))} éléments")
             
         except Exception as e:
-            print(f"  Erreur lors de la génération: {e}")
+            lines.append(f"  Erreur lors de la génération: {e}")
+        return lines
+    
+    for lines in _run_parallel(_process_one, profiles.items()):
+        _print_lines(lines)
 
 
-def test_full_pipeline():
-    """Test du pipeline complet"""
+def test_full_pipeline(profile_generator, prompt_transformer, ui_generator):
+    """Test du pipeline complet, retourne les résultats en mémoire par type de profil"""
     
     print("\n=== Test du Pipeline Complet ===")
     
-    # Créer des données de test
-    test_data = create_test_conversation_data()
-    
-    # Initialiser tous les composants
-    profile_generator = ProfileGenerator()
-    prompt_transformer = PromptTransformer()
-    ui_generator = EnhancedUIGenerator(model_type="t5", model_name="t5-small")
-    
-    for profile_type, conversation_data in test_data.items():
-        print(f"\nPipeline complet pour: {profile_type}")
+    def _process_one(item):
+        profile_type, df = item
+        lines = [f"\nPipeline complet pour: {profile_type}"]
+        result = None
+        write = None
         
         try:
             # Étape 1: Analyser la conversation
-            df = pd.DataFrame(conversation_data)
             profile = profile_generator.generate_profile(df)
-            print(f"  ✓ Profil généré")
+            lines.append(f"  ✓ Profil généré")
             
             # Étape 2: Transformer en prompt
             prompt = prompt_transformer.profile_to_prompt(profile)
             recommendations = prompt_transformer.generate_ui_recommendations(profile)
-            print(f"  ✓ Prompt et recommandations générés")
+            lines.append(f"  ✓ Prompt et recommandations générés")
             
             # Étape 3: Générer la configuration UI
             ui_config = ui_generator.generate_ui_config(
@@ -239,7 +305,7 @@ def test_full_pipeline():
                 learner_recommendations=recommendations,
                 temperature=0.5
             )
-            print(f"  ✓ Configuration UI générée")
+            lines.append(f"  ✓ Configuration UI générée")
             
             # Sauvegarder les résultats
             result = {
@@ -249,50 +315,85 @@ def test_full_pipeline():
                 "ui_config": ui_config
             }
             
-            with open(f"test_result_{profile_type}.json", "w", encoding="utf-8") as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
-            
-            print(f"  ✓ Résultats sauvegardés dans test_result_{profile_type}.json")
+            # Copie disque pour le débogage, écrite en arrière-plan (confirmée plus bas)
+            write = _IO_EXECUTOR.submit(_write_json, f"test_result_{profile_type}.json", result)
             
         except Exception as e:
-            print(f"  ✗ Erreur dans le pipeline: {e}")
+            lines.append(f"  ✗ Erreur dans le pipeline: {e}")
+        return profile_type, result, lines, write
+    
+    results = {}
+    for profile_type, result, lines, write in _run_parallel(_process_one, get_test_dataframes().items()):
+        if write is not None:
+            # Attendre la fin de l'écriture avant d'annoncer la sauvegarde
+            try:
+                write.result()
+                lines.append(f"  ✓ Résultats sauvegardés dans test_result_{profile_type}.json")
+            except (OSError, TypeError, ValueError) as e:
+                lines.append(f"  ✗ Erreur lors de la sauvegarde: {e}")
+        _print_lines(lines)
+        if result is not None:
+            results[profile_type] = result
+    
+    return results
+
+
+# Mots-clés attendus dans la configuration UI selon le style dominant
+_VISUAL_KEYWORDS = frozenset({"visual", "image"})
+_KINESTHETIC_KEYWORDS = frozenset({"interactive", "touch"})
+
+
+def _flatten_tokens(cfg):
+    """Parcours itératif (pile) de la configuration : clés et feuilles texte en casefold"""
+    stack = [cfg]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if isinstance(key, str):
+                    yield key.casefold()
+                stack.append(value)
+        elif isinstance(node, (list, tuple)):
+            stack.extend(node)
+        elif isinstance(node, str):
+            yield node.casefold()
 
 
-def validate_recommendations_quality():
-    """Valide la qualité des recommandations générées"""
+def _mentions(tokens, keywords):
+    """Vrai si un mot-clé apparaît dans l'un des tokens (sous-chaîne, comme la recherche d'origine dans str(ui_config))"""
+    return any(kw in tok for tok in tokens for kw in keywords)
+
+
+def validate_recommendations_quality(results):
+    """Valide la qualité des recommandations générées (résultats en mémoire de test_full_pipeline)"""
     
     print("\n=== Validation de la Qualité des Recommandations ===")
     
-    # Charger les résultats de test
-    test_files = ["test_result_visual_extrovert.json", 
-                  "test_result_kinesthetic_struggling.json", 
-                  "test_result_analytical_organized.json"]
-    
-    for test_file in test_files:
-        if os.path.exists(test_file):
-            print(f"\nValidation de {test_file}:")
-            
-            with open(test_file, "r", encoding="utf-8") as f:
-                result = json.load(f)
+    for profile_type, result in results.items():
+        if result:
+            print(f"\nValidation de test_result_{profile_type}.json:")
             
             profile = result["profile"]
             ui_config = result["ui_config"]
             
             # Validation basée sur le style d'apprentissage
             learning_style = profile["learning_style"]
-            dominant_style = max(learning_style, key=learning_style.get)
+            dominant_style = max(learning_style.items(), key=itemgetter(1))[0]
             
             print(f"  Style dominant détecté: {dominant_style}")
             
+            # Tokens de la configuration, calculés une seule fois par profil
+            tokens = set(_flatten_tokens(ui_config))
+            
             # Vérifications spécifiques
             if dominant_style == "visual":
-                if "visual" in str(ui_config).lower() or "image" in str(ui_config).lower():
+                if _mentions(tokens, _VISUAL_KEYWORDS):
                     print("  ✓ Configuration adaptée aux apprenants visuels")
                 else:
                     print("  ⚠ Configuration pourrait mieux s'adapter aux apprenants visuels")
             
             elif dominant_style == "kinesthetic":
-                if "interactive" in str(ui_config).lower() or "touch" in str(ui_config).lower():
+                if _mentions(tokens, _KINESTHETIC_KEYWORDS):
                     print("  ✓ Configuration adaptée aux apprenants kinesthésiques")
                 else:
                     print("  ⚠ Configuration pourrait mieux s'adapter aux apprenants kinesthésiques")
@@ -316,51 +417,17 @@ def validate_recommendations_quality():
 
 def _get_dominant_learning_style(learning_style):
     """Retourne le style d'apprentissage dominant"""
-    styles = {
-        'visual': learning_style.visual,
-        'auditory': learning_style.auditory,
-        'reading': learning_style.reading,
-        'kinesthetic': learning_style.kinesthetic
-    }
-    return max(styles, key=styles.get)
+    return max((
+        ('visual', learning_style.visual),
+        ('auditory', learning_style.auditory),
+        ('reading', learning_style.reading),
+        ('kinesthetic', learning_style.kinesthetic)
+    ), key=itemgetter(1))[0]
 
 
 def _profile_to_dict(profile):
-    """Convertit un LearnerProfile en dictionnaire"""
-    return {
-        "learner_id": profile.learner_id,
-        "learning_style": {
-            "visual": profile.learning_style.visual,
-            "auditory": profile.learning_style.auditory,
-            "reading": profile.learning_style.reading,
-            "kinesthetic": profile.learning_style.kinesthetic
-        },
-        "personality": {
-            "extraversion": profile.personality.extraversion,
-            "intuition": profile.personality.intuition,
-            "thinking": profile.personality.thinking,
-            "judging": profile.personality.judging
-        },
-        "cognitive": {
-            "processing_speed": profile.cognitive.processing_speed,
-            "working_memory": profile.cognitive.working_memory,
-            "analytical_thinking": profile.cognitive.analytical_thinking,
-            "creative_thinking": profile.cognitive.creative_thinking,
-            "attention_span": profile.cognitive.attention_span
-        },
-        "behavioral": {
-            "engagement_level": profile.behavioral.engagement_level,
-            "persistence": profile.behavioral.persistence,
-            "help_seeking": profile.behavioral.help_seeking,
-            "collaboration_preference": profile.behavioral.collaboration_preference,
-            "self_regulation": profile.behavioral.self_regulation
-        },
-        "strengths": profile.strengths,
-        "difficulty_areas": profile.difficulty_areas,
-        "recommended_strategies": profile.recommended_strategies,
-        "confidence_level": profile.confidence_level,
-        "last_updated": profile.last_updated.isoformat()
-    }
+    """Convertit un LearnerProfile en dictionnaire (dataclasses imbriquées, datetime conservé)"""
+    return asdict(profile)
 
 
 def main():
@@ -370,20 +437,25 @@ def main():
     print("=" * 50)
     
     try:
+        # Initialiser les composants une seule fois pour tous les tests
+        profile_generator = ProfileGenerator()
+        prompt_transformer = PromptTransformer()
+        ui_generator = get_ui_generator("t5", "t5-small")
+        
         # Test 1: Génération de profils
-        profiles = test_profile_generation()
+        profiles = test_profile_generation(profile_generator)
         
         # Test 2: Transformation en prompts
-        test_prompt_transformation(profiles)
+        test_prompt_transformation(profiles, prompt_transformer)
         
         # Test 3: Génération UI
-        test_ui_generation(profiles)
+        test_ui_generation(profiles, prompt_transformer, ui_generator)
         
         # Test 4: Pipeline complet
-        test_full_pipeline()
+        results = test_full_pipeline(profile_generator, prompt_transformer, ui_generator)
         
         # Test 5: Validation de la qualité
-        validate_recommendations_quality()
+        validate_recommendations_quality(results)
         
         print("\n" + "=" * 50)
         print("Tests terminés avec succès !")
@@ -392,6 +464,10 @@ def main():
         print(f"\nErreur lors des tests: {e}")
         import traceback
         traceback.print_exc()
+    
+    finally:
+        # Attendre la fin des écritures de résultats en arrière-plan
+        _IO_EXECUTOR.shutdown(wait=True)
 
 
 if __name__ == "__main__":
@@ -1,16 +1,21 @@
 
-# Mapping profils -> contraintes UI/UX
-from copy import deepcopy
+from types import MappingProxyType
 
-VARK_UI = {
-    "V": {"layout": "two_column_visual_first", "components": ["diagram", "stepper"]},
-    "A": {"layout": "single_column", "components": ["audio_hint", "recap"]},
-    "R": {"layout": "single_column", "components": ["definitions", "table"]},
-    "K": {"layout": "lab_mode", "components": ["checklist", "mini_project"]},
-}
+# Mapping profils -> contraintes UI/UX (table figée : tuples + MappingProxyType)
+
+VARK_UI = MappingProxyType({
+    "V": MappingProxyType({"layout": "two_column_visual_first", "components": ("diagram", "stepper")}),
+    "A": MappingProxyType({"layout": "single_column", "components": ("audio_hint", "recap")}),
+    "R": MappingProxyType({"layout": "single_column", "components": ("definitions", "table")}),
+    "K": MappingProxyType({"layout": "lab_mode", "components": ("checklist", "mini_project")}),
+})
 
 def ui_from_profile(vark: str, mbti: str):
-    base = deepcopy(VARK_UI.get(vark, VARK_UI["R"]))
-    base["verbosity"] = "high" if mbti.startswith("EN") else "medium"
-    base["tone"] = "supportive" if "F" in mbti else "concise"
-    return base
+    # Table immuable : dict neuf par appel ; components rendu en liste (type "array" du schéma JSON)
+    entry = VARK_UI.get(vark, VARK_UI["R"])
+    return {
+        **entry,
+        "components": list(entry["components"]),
+        "verbosity": "high" if mbti.startswith("EN") else "medium",
+        "tone": "supportive" if "F" in mbti else "concise",
+    }
@@ -1,4 +1,3 @@
-
 from prefect import flow, task
 
 @task
@@ -6,27 +5,30 @@ def extract():
     # TODO: charger JSON de conversations (disk/db/api)
     return []
 
-@task
-def preprocess(batch):
+# ---------- Étapes CPU légères (fonctions simples, sans overhead Prefect) ----------
+
+def preprocess(conversation):
     # TODO: nettoyage, normalisation
-    return batch
+    return conversation
 
-@task
 def features(clean):
     # TODO: extraire features (linguistique, comportement)
-    return [{"features": {}, "conversation": c} for c in clean]
+    return {"features": {}, "conversation": clean}
 
-@task
-def profiles(items):
+def profiles(item):
     # TODO: appeler vos classifieurs VARK/MBTI
-    for it in items:
-        it["profiles"] = {"VARK":"R","MBTI":"INTJ"}
-    return items
+    item["profiles"] = {"VARK":"R","MBTI":"INTJ"}
+    return item
 
-@task
-def prompts(items):
+def prompts(item):
     # TODO: build prompt en fonction de profiles/features
-    return items
+    return item
+
+@task
+def build_items(raw):
+    # Une seule tâche Prefect pour preprocess → features → profiles → prompts,
+    # en un seul passage sur chaque conversation
+    return [prompts(profiles(features(preprocess(c)))) for c in raw]
 
 @task
 def generate(items):
@@ -41,11 +43,8 @@ def log(items):
 @flow
 def unified_pipeline():
     raw = extract()
-    clean = preprocess(raw)
-    feats = features(clean)
-    prof = profiles(feats)
-    pr = prompts(prof)
-    gen = generate(pr)
+    items = build_items(raw)
+    gen = generate(items)
     log(gen)
 
 if __name__ == "__main__":
@@ -1,69 +1,156 @@
 import json
+import os
+from functools import lru_cache
+
 import pandas as pd
 import torch
-from transformers import T5Tokenizer, T5ForConditionalGeneration
+from torch.utils.data import DataLoader, TensorDataset
+from transformers import T5TokenizerFast, T5ForConditionalGeneration
+
+# pyarrow CSV engine if available, otherwise pandas' C parser
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+DATASET_PATH = "enhanced_ui_preference_dataset.csv"
+MODEL_NAME = "t5-small"
+OUTPUT_DIR = "/mnt/data/ui_json_generator"
+TOKENIZED_PATH = "tokenized.pt"
+
+# Only these columns are used to build the training pairs
+DATASET_COLUMNS = ["Layout Preference", "UI Theme", "Color Palette"]
 
-# Load Dataset
-dataset_path = "enhanced_ui_preference_dataset.csv"
-df = pd.read_csv(dataset_path)
 
+# Tokenizer & Model Setup (lazy singletons: importing this module loads nothing)
+@lru_cache(maxsize=1)
+def get_tokenizer():
+    """Load the T5 tokenizer on first use."""
+    return T5TokenizerFast.from_pretrained(MODEL_NAME)
 
-print(df.head())
+def compile_model(model):
+    """Compile the forward pass with torch.compile on GPU (kernel fusion + CUDA graphs); eager on CPU."""
+    if torch.cuda.is_available() and hasattr(torch, "compile"):
+        # Compile the bound forward so save_pretrained/generate keep working on the module itself
+        model.forward = torch.compile(model.forward, mode="reduce-overhead", fullgraph=False)
+    return model
 
-# Preprocess Data: Convert relevant columns to JSON-compatible format
-def preprocess_data(row):
-    """Convert a dataset row into a prompt-response format for model training."""
-    input_text = f"Generate a UI configuration for {row['Layout Preference']} mode."
-    output_json = {
-        "theme": row["UI Theme"],
-        "layout": json.loads(row["Layout Preference"]),  
-        "colors": json.loads(row["Color Palette"])
-    }
-    return input_text, json.dumps(output_json)
+@lru_cache(maxsize=1)
+def get_model():
+    """Load the T5 model on first use."""
+    return compile_model(T5ForConditionalGeneration.from_pretrained(MODEL_NAME))
 
-# Tokenizer & Model Setup
-tokenizer = T5Tokenizer.from_pretrained("t5-small")
-model = T5ForConditionalGeneration.from_pretrained("t5-small")
+def load_dataset(dataset_path=DATASET_PATH):
+    """Load the UI preference dataset (used columns only)."""
+    if PYARROW_AVAILABLE:
+        return pd.read_csv(dataset_path, engine="pyarrow", usecols=DATASET_COLUMNS, dtype_backend="pyarrow")
+    return pd.read_csv(dataset_path, usecols=DATASET_COLUMNS)
+
+def build_training_pairs(df):
+    """Build prompt-response pairs column-wise (no per-row apply)."""
+    input_texts = ("Generate a UI configuration for " + df["Layout Preference"].astype("string") + " mode.").tolist()
+    layouts = [json.loads(x) for x in df["Layout Preference"].to_numpy()]
+    colors = [json.loads(x) for x in df["Color Palette"].to_numpy()]
+    output_texts = [
+        json.dumps({"theme": theme, "layout": layout, "colors": palette})
+        for theme, layout, palette in zip(df["UI Theme"].to_numpy(), layouts, colors)
+    ]
+    return input_texts, output_texts
 
 def tokenize_data(input_texts, output_texts):
-    """Tokenizes input-output pairs for training."""
-    inputs = tokenizer(input_texts, padding=True, truncation=True, return_tensors="pt", max_length=512)
-    outputs = tokenizer(output_texts, padding=True, truncation=True, return_tensors="pt", max_length=512)
+    """Tokenizes input-output pairs for training (one bulk call per side, Rust fast tokenizer)."""
+    tokenizer = get_tokenizer()
+    # Lengths padded to multiples of 8 so the compiled model sees few distinct shapes
+    inputs = tokenizer(list(input_texts), padding="longest", truncation=True, return_tensors="pt",
+                       max_length=512, return_attention_mask=True, pad_to_multiple_of=8)
+    outputs = tokenizer(list(output_texts), padding="longest", truncation=True, return_tensors="pt",
+                        max_length=512, pad_to_multiple_of=8)
+    # Ignore padded label positions in T5's built-in cross-entropy
+    outputs['input_ids'][outputs['input_ids'] == tokenizer.pad_token_id] = -100
+    return inputs, outputs
+
+def load_or_tokenize(dataset_path=DATASET_PATH, cache_path=TOKENIZED_PATH):
+    """Return tokenized training tensors, memory-mapped from cache_path when it is newer than the dataset."""
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(dataset_path):
+        cached = torch.load(cache_path, mmap=True, weights_only=True)
+    else:
+        inputs, outputs = tokenize_data(*build_training_pairs(load_dataset(dataset_path)))
+        # T5's vocab fits in int32: half the bytes of int64 on disk and per batch
+        cached = {
+            "input_ids": inputs["input_ids"].to(torch.int32),
+            "attention_mask": inputs["attention_mask"].to(torch.int32),
+            "labels": outputs["input_ids"].to(torch.int32),
+        }
+        torch.save(cached, cache_path)
+    inputs = {"input_ids": cached["input_ids"], "attention_mask": cached["attention_mask"]}
+    outputs = {"input_ids": cached["labels"]}
     return inputs, outputs
 
-# Prepare Training Data
-input_texts, output_texts = zip(*df.apply(preprocess_data, axis=1))
-inputs, outputs = tokenize_data(input_texts, output_texts)
+def train_model(model, inputs, outputs, epochs=3, batch_size=16):
+    """Fine-tune the model for JSON generation (mini-batches, mixed precision on GPU)."""
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    use_amp = device == "cuda"
+    # BF16 needs no loss scaling; FP16 goes through a GradScaler
+    amp_dtype = torch.bfloat16 if use_amp and torch.cuda.is_bf16_supported() else torch.float16
+    scaler = torch.amp.GradScaler("cuda", enabled=use_amp and amp_dtype == torch.float16)
+
+    model.to(device)
+    dataset = TensorDataset(inputs['input_ids'], inputs['attention_mask'], outputs['input_ids'])
+    loader = DataLoader(dataset, batch_size=batch_size, shuffle=True, pin_memory=use_amp)
 
-def train_model(model, inputs, outputs, epochs=3):
-    """Fine-tune the model for JSON generation."""
     optimizer = torch.optim.AdamW(model.parameters(), lr=5e-5)
-    loss_fn = torch.nn.CrossEntropyLoss()
     model.train()
     
     for epoch in range(epochs):
-        optimizer.zero_grad()
-        outputs_model = model(input_ids=inputs['input_ids'], labels=outputs['input_ids'])
-        loss = outputs_model.loss
-        loss.backward()
-        optimizer.step()
+        for input_ids, attention_mask, labels in loader:
+            # Cached ids may be int32; the embedding gather and the loss expect int64
+            input_ids = input_ids.to(device, dtype=torch.long, non_blocking=True)
+            attention_mask = attention_mask.to(device, dtype=torch.long, non_blocking=True)
+            labels = labels.to(device, dtype=torch.long, non_blocking=True)
+
+            optimizer.zero_grad(set_to_none=True)
+            with torch.autocast(device_type=device, dtype=amp_dtype, enabled=use_amp):
+                outputs_model = model(input_ids=input_ids, attention_mask=attention_mask, labels=labels)
+                loss = outputs_model.loss
+            scaler.scale(loss).backward()
+            scaler.step(optimizer)
+            scaler.update()
         print(f"Epoch {epoch+1}, Loss: {loss.item()}")
 
+# Generate New JSON from Prompts
+def generate_ui_json_batch(prompts):
+    """Generate UI JSON configurations for a batch of text prompts (greedy, KV cache)."""
+    tokenizer = get_tokenizer()
+    model = get_model()
+    with torch.inference_mode():
+        enc = tokenizer(prompts, return_tensors="pt", padding=True, truncation=True, max_length=512,
+                        pad_to_multiple_of=8).to(model.device)
+        output_ids = model.generate(**enc, max_length=512, use_cache=True, num_beams=1, do_sample=False)
+    return tokenizer.batch_decode(output_ids, skip_special_tokens=True)
 
-train_model(model, inputs, outputs)
+def generate_ui_json(prompt):
+    """Generate a UI JSON configuration from a single text prompt."""
+    return generate_ui_json_batch([prompt])[0]
 
+def main():
+    """Load (or reuse) the tokenized dataset, fine-tune, save the checkpoint and run an example generation."""
+    inputs, outputs = load_or_tokenize()
+    print(f"Training examples: {len(inputs['input_ids'])}")
 
-model.save_pretrained("/mnt/data/ui_json_generator")
-tokenizer.save_pretrained("/mnt/data/ui_json_generator")
+    model = get_model()
+    train_model(model, inputs, outputs)
 
-# Generate New JSON from Prompt
-def generate_ui_json(prompt):
-    """Generate a UI JSON configuration from a text prompt."""
+    model.save_pretrained(OUTPUT_DIR)
+    get_tokenizer().save_pretrained(OUTPUT_DIR)
+
+    # Switch to inference mode once, not on every generation call
     model.eval()
-    input_ids = tokenizer(prompt, return_tensors="pt").input_ids
-    output_ids = model.generate(input_ids, max_length=512)
-    return tokenizer.decode(output_ids[0], skip_special_tokens=True)
 
-# Example Usage
-prompt = "Generate a UI configuration for dark mode."
-print("Generated JSON:", generate_ui_json(prompt))
+    # Example Usage
+    prompt = "Generate a UI configuration for dark mode."
+    print("Generated JSON:", generate_ui_json(prompt))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,26 @@
 """
 Générateur UI amélioré qui intègre les profils d'apprenants.
 Version tolérante : fonctionne même sans torch (fallback).
+
+Variables d'environnement :
+    UIGEN_TORCH_THREADS  nombre de threads intra-op torch en inférence CPU (défaut : 1)
+    UIGEN_CPU_BF16       1 / 0 : force ou interdit bf16 sur CPU (défaut : selon le support matériel)
 """
 
+import importlib.util
 import json
 import logging
-from datetime import datetime
+import os
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
 from typing import Dict, Any, Optional, List
 
+from .profile_generator import _utcnow_iso
+
 logger = logging.getLogger(__name__)
 
 # ---------- Gestion optionnelle de torch ----------
@@ -19,36 +32,129 @@ except ImportError:
     TORCH_AVAILABLE = False
     logger.warning("Torch non disponible : le générateur utilisera le mode fallback (sans modèle).")
 
-# ---------- Transformers (présents dans ton venv) ----------
+# ---------- orjson optionnel (parsing JSON plus rapide) ----------
 try:
-    from transformers import (
-        T5Tokenizer,
-        T5ForConditionalGeneration,
-        GPT2LMHeadModel,
-        GPT2Tokenizer,
-    )
-    HF_AVAILABLE = True
+    import orjson
+    ORJSON_AVAILABLE = True
 except ImportError:
-    T5Tokenizer = T5ForConditionalGeneration = GPT2LMHeadModel = GPT2Tokenizer = None  # type: ignore
-    HF_AVAILABLE = False
+    orjson = None  # type: ignore
+    ORJSON_AVAILABLE = False
+
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+# ---------- Transformers (importé au premier _load_model, seul le flag est calculé ici) ----------
+HF_AVAILABLE = importlib.util.find_spec("transformers") is not None
+if not HF_AVAILABLE:
     logger.warning("transformers non disponible : le générateur utilisera le mode fallback.")
 
+# ---------- Mots-clés du texte généré (un seul passage regex) ----------
+_KW_RE = re.compile(
+    r"(?P<dark>dark|sombre)"
+    r"|(?P<hc>high contrast|contraste)"
+    r"|(?P<inter>interactive|interactif|drag|touch)"
+    r"|(?P<help>help|aide|tooltip)"
+    r"|(?P<lin>linear|linéaire|étape)"
+    r"|(?P<hier>hierarchical|hiérarchique)",
+    re.IGNORECASE,
+)
+
+# Longueur minimale (hors espaces) d'un prompt pour solliciter le modèle
+MIN_PROMPT_CHARS = 4
+# Sans recommandations, un prompt plus court que ceci donne la config par défaut
+MIN_BARE_PROMPT_CHARS = 8
+
+# ---------- Gabarits de configuration (construits une fois, jamais modifiés) ----------
+_DEFAULT_COLORS = {
+    "primary": "#3498db",
+    "secondary": "#2ecc71",
+    "accent": "#e74c3c",
+    "background": "#ffffff",
+    "text": "#2c3e50",
+}
+_DEFAULT_TYPOGRAPHY = {
+    "font_family": "Arial, sans-serif",
+    "font_sizes": {"h1": "2rem", "h2": "1.5rem", "body": "1rem"},
+}
+_DEFAULT_CONFIG_TEMPLATE = {
+    "theme": "light",
+    "layout": {
+        "type": "standard",
+        "sections": ("header", "content", "footer"),
+    },
+    "colors": _DEFAULT_COLORS,
+    "typography": _DEFAULT_TYPOGRAPHY,
+    "interactions": (),
+    "navigation": {"type": "horizontal", "position": "top"},
+}
+
+# Champs requis d'une configuration : (clé, type attendu, valeur par défaut)
+_SCHEMA = (
+    ("theme", str, "light"),
+    ("layout", dict, _DEFAULT_CONFIG_TEMPLATE["layout"]),
+    ("colors", dict, _DEFAULT_COLORS),
+    ("typography", dict, _DEFAULT_TYPOGRAPHY),
+    ("interactions", list, ()),
+    ("navigation", dict, _DEFAULT_CONFIG_TEMPLATE["navigation"]),
+    ("metadata", dict, {}),
+)
+
+# Marqueur posé par _text_to_config (gabarit déjà complet) : la validation est sautée.
+# Valeur objet et non booléen : un JSON généré contenant "__valid__" ne peut pas l'imiter.
+_VALID_KEY = "__valid__"
+_VALID = object()
+
+
+def _clone(obj: Any) -> Any:
+    """Copie mutable d'un gabarit (dicts copiés, tuples -> listes), plus légère que deepcopy."""
+    if isinstance(obj, dict):
+        return {k: _clone(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_clone(v) for v in obj]
+    return obj
+
+
+def _blank_config() -> Dict[str, Any]:
+    """Config par défaut raisonnable, modifiable par l'appelant."""
+    return _clone(_DEFAULT_CONFIG_TEMPLATE)
+
 
 class EnhancedUIGenerator:
     """Générateur UI amélioré avec support des profils d'apprenants"""
 
-    def __init__(self, model_type: str = "t5", model_name: str = "t5-small"):
+    # Nombre maximal de tokens générés par appel (borne max_length)
+    MAX_NEW_TOKENS = 256
+
+    def __init__(self, model_type: str = "t5", model_name: str = "t5-small", do_sample: bool = False):
         """
         Args:
             model_type: "t5" ou "gpt2"
             model_name: nom du modèle pré-entraîné
+            do_sample: échantillonnage (temperature) au lieu du décodage glouton
         """
         self.model_type = model_type
         self.model_name = model_name
+        self.do_sample = do_sample
         self.tokenizer = None
         self.model = None
         self.device = "cpu"
-        self._load_model()
+        # Préfixe/suffixe fixes des prompts, tokenisés une fois au chargement
+        self._prefix_ids = None
+        self._suffix_ids = None
+        # Identifiants pad/eos du tokenizer, en int simples
+        self._pad_id: Optional[int] = None
+        self._eos_id: Optional[int] = None
+        # Chargement paresseux : le modèle n'est chargé qu'à la première génération
+        self._loaded = False
+        self._load_lock = threading.Lock()
+
+    def _ensure_loaded(self):
+        """Charge le modèle une seule fois, même sous appels concurrents."""
+        if self._loaded:
+            return
+        with self._load_lock:
+            if not self._loaded:
+                self._load_model()
+                self._loaded = True
 
     # ---------- Chargement du modèle (ou fallback) ----------
     def _load_model(self):
@@ -60,24 +166,125 @@ class EnhancedUIGenerator:
             return
 
         try:
+            import transformers
+            from packaging.version import Version
+            from transformers import (
+                T5TokenizerFast,
+                T5ForConditionalGeneration,
+                GPT2LMHeadModel,
+                GPT2TokenizerFast,
+            )
+
+            self.device = "cuda" if torch.cuda.is_available() else "cpu"  # type: ignore
+            # transformers >= 4.56 : torch_dtype renommé dtype (l'ancien nom est ignoré en v5)
+            dtype_kw = "dtype" if Version(transformers.__version__) >= Version("4.56") else "torch_dtype"
+            dtype = self._select_dtype()
+
             if self.model_type == "t5":
-                self.tokenizer = T5Tokenizer.from_pretrained(self.model_name)
-                self.model = T5ForConditionalGeneration.from_pretrained(self.model_name)
+                self.tokenizer = T5TokenizerFast.from_pretrained(self.model_name)
+                self.model = T5ForConditionalGeneration.from_pretrained(self.model_name, **{dtype_kw: dtype})
             elif self.model_type == "gpt2":
-                self.tokenizer = GPT2Tokenizer.from_pretrained(self.model_name)
-                self.model = GPT2LMHeadModel.from_pretrained(self.model_name)
+                self.tokenizer = GPT2TokenizerFast.from_pretrained(self.model_name)
+                self.model = GPT2LMHeadModel.from_pretrained(self.model_name, **{dtype_kw: dtype})
                 self.tokenizer.pad_token = self.tokenizer.eos_token
             else:
                 raise ValueError(f"Type de modèle non supporté: {self.model_type}")
 
-            self.device = "cuda" if torch.cuda.is_available() else "cpu"  # type: ignore
+            if self.device == "cpu":
+                self._limit_cpu_threads()
             self.model.to(self.device)  # type: ignore
+            self._cache_prompt_affixes()
+            if self.device == "cuda":
+                self._compile_model()
             logger.info(f"Modèle {self.model_name} chargé avec succès sur {self.device}")
         except Exception as e:
             logger.error(f"Erreur lors du chargement du modèle ({e}), bascule en fallback.")
             self.model = None
             self.tokenizer = None
 
+    def _select_dtype(self):
+        """
+        CUDA : fp16 (GPT-2), bf16 ou fp32 pour T5 (débordements connus en fp16).
+        CPU : bf16 seulement avec support matériel natif (AVX512-BF16 / AMX), sinon fp32
+        (bf16 émulé plus lent que fp32 ; pas d'int8 : plus lent sur t5-small).
+        """
+        if self.device == "cuda":
+            if self.model_type != "t5":
+                return torch.float16  # type: ignore
+            return torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float32  # type: ignore
+        if self._cpu_bf16_ok():
+            return torch.bfloat16  # type: ignore
+        return torch.float32  # type: ignore
+
+    @staticmethod
+    def _cpu_bf16_ok() -> bool:
+        """bf16 sur CPU : UIGEN_CPU_BF16 si défini, sinon support bf16 natif de oneDNN."""
+        forced = os.environ.get("UIGEN_CPU_BF16")
+        if forced is not None:
+            return forced == "1"
+        if not torch.backends.mkldnn.is_available():  # type: ignore
+            return False
+        try:
+            return bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())  # type: ignore
+        except (AttributeError, RuntimeError):
+            return False
+
+    def _compile_model(self):
+        """
+        torch.compile du forward (GPU) puis génération d'échauffement, pour que la
+        compilation ne tombe pas sur la première vraie requête. Eager si échec.
+        """
+        if not hasattr(torch, "compile"):
+            return
+        try:
+            # Forward lié compilé : generate() et save_pretrained restent sur le module d'origine
+            self.model.forward = torch.compile(self.model.forward, mode="reduce-overhead", dynamic=True)  # type: ignore
+            generate = self._generate_with_t5 if self.model_type == "t5" else self._generate_with_gpt2
+            generate("warmup", 8, 1.0)
+        except Exception as e:
+            logger.warning(f"torch.compile indisponible ({e}), exécution eager.")
+            # Retire le forward compilé de l'instance : retour à la méthode de classe
+            vars(self.model).pop("forward", None)
+
+    @staticmethod
+    def _limit_cpu_threads():
+        """Peu de threads torch sur CPU : évite la sur-souscription pour de petits modèles."""
+        torch.set_num_threads(int(os.environ.get("UIGEN_TORCH_THREADS", "1")))  # type: ignore
+        try:
+            torch.set_num_interop_threads(1)  # type: ignore
+        except RuntimeError:
+            # Ne peut être fixé qu'une fois, avant tout travail parallèle
+            pass
+
+    def _encode(self, text: str):
+        """Tokenise un texte sans tokens spéciaux -> tensor (1, n)"""
+        return self.tokenizer(
+            text,
+            return_tensors="pt",
+            add_special_tokens=False,
+            return_attention_mask=False,
+            return_token_type_ids=False,
+        ).input_ids
+
+    def _cache_prompt_affixes(self):
+        """Pré-tokenise les parties fixes des prompts (déjà placées sur le device) et les ids pad/eos."""
+        self._pad_id = int(self.tokenizer.pad_token_id)
+        self._eos_id = int(self.tokenizer.eos_token_id)
+        if self.model_type == "t5":
+            self._prefix_ids = self._encode("generate ui config:").to(self.device)
+            self._suffix_ids = torch.tensor([[self._eos_id]], device=self.device)  # type: ignore
+        else:
+            self._prefix_ids = self._encode("UI Configuration:").to(self.device)
+            self._suffix_ids = self._encode("\nJSON:").to(self.device)
+
+    def _build_input_ids(self, prompt: str, max_tokens: int):
+        """Préfixe en cache + prompt tokenisé (tronqué) + suffixe en cache."""
+        budget = max_tokens - self._prefix_ids.shape[1] - self._suffix_ids.shape[1]
+        # GPT2 (BPE) encode l'espace de séparation dans le token suivant
+        text = prompt if self.model_type == "t5" else f" {prompt}"
+        prompt_ids = self._encode(text)[:, :max(budget, 0)].to(self.device)
+        return torch.cat([self._prefix_ids, prompt_ids, self._suffix_ids], dim=1)  # type: ignore
+
     # ---------- API principale ----------
     def generate_ui_config(
         self,
@@ -91,24 +298,63 @@ class EnhancedUIGenerator:
         Génère une configuration UI à partir d'un prompt et de recommandations.
         Si le modèle n'est pas disponible, renvoie une config fallback structurée.
         """
-        enhanced_prompt = self._enhance_prompt_with_recommendations(prompt, learner_recommendations)
-
-        # Pas de modèle dispo -> fallback direct
-        if self.model is None or self.tokenizer is None or not TORCH_AVAILABLE or not HF_AVAILABLE:
-            return self._get_fallback_config(learner_recommendations)
+        return self.generate_ui_configs([prompt], [learner_recommendations], max_length, temperature)[0]
 
-        try:
-            if self.model_type == "t5":
-                generated_text = self._generate_with_t5(enhanced_prompt, max_length, temperature)
+    def generate_ui_configs(
+        self,
+        prompts: List[str],
+        recommendations_list: Optional[List[Optional[Dict[str, Any]]]] = None,
+        max_length: int = 512,
+        temperature: float = 0.7,
+    ) -> List[Dict[str, Any]]:
+        """
+        Version en lot : un seul generate() (padding + attention_mask) pour tous
+        les prompts non triviaux. Retourne une configuration par prompt, dans l'ordre.
+        """
+        if recommendations_list is None:
+            recommendations_list = [None] * len(prompts)
+        configs: List[Optional[Dict[str, Any]]] = [None] * len(prompts)
+
+        pending = []  # (index, prompt enrichi)
+        for i, (prompt, recs) in enumerate(zip(prompts, recommendations_list)):
+            # Prompt vide ou trivial : rien à générer, pas de tokenisation ni de decode
+            if not prompt or len(prompt.strip()) < MIN_PROMPT_CHARS:
+                configs[i] = self._get_fallback_config(recs)
             else:
-                generated_text = self._generate_with_gpt2(enhanced_prompt, max_length, temperature)
+                pending.append((i, self._enhance_prompt_with_recommendations(prompt, recs)))
+
+        if pending:
+            try:
+                texts = self._generate_texts([p for _, p in pending], max_length, temperature)
+            except Exception as e:
+                logger.error(f"Erreur lors de la génération UI, fallback utilisé: {e}")
+                texts = None
+
+            for (i, _), text in zip(pending, texts or [None] * len(pending)):
+                recs = recommendations_list[i]
+                if text is None:
+                    configs[i] = self._get_fallback_config(recs)
+                    continue
+                try:
+                    configs[i] = self._post_process_generation(text, recs)
+                except Exception as e:
+                    logger.error(f"Erreur lors de la génération UI, fallback utilisé: {e}")
+                    configs[i] = self._get_fallback_config(recs)
+
+        return configs  # type: ignore[return-value]
+
+    def _generate_texts(self, prompts: List[str], max_length: int, temperature: float) -> Optional[List[str]]:
+        """Textes générés, ou None si aucun modèle n'est utilisable (fallback)."""
+        # Pas de torch/transformers -> fallback direct, sans tenter de chargement
+        if not TORCH_AVAILABLE or not HF_AVAILABLE:
+            return None
 
-            config = self._post_process_generation(generated_text, learner_recommendations)
-            return config
+        self._ensure_loaded()
 
-        except Exception as e:
-            logger.error(f"Erreur lors de la génération UI, fallback utilisé: {e}")
-            return self._get_fallback_config(learner_recommendations)
+        # Pas de modèle dispo -> fallback direct
+        if self.model is None or self.tokenizer is None:
+            return None
+        return self._generate_batch(prompts, max_length, temperature)
 
     # ---------- Enrichissement du prompt ----------
     def _enhance_prompt_with_recommendations(
@@ -135,48 +381,49 @@ class EnhancedUIGenerator:
         return enhanced_prompt
 
     # ---------- Génération modèle (T5 / GPT2) ----------
-    def _generate_with_t5(self, prompt: str, max_length: int, temperature: float) -> str:
-        input_text = f"generate ui config: {prompt}"
-        input_ids = self.tokenizer(
-            input_text,
-            return_tensors="pt",
-            max_length=512,
-            truncation=True,
-            padding=True,
-        ).input_ids.to(self.device)
+    def _generation_kwargs(self, max_length: int, temperature: float) -> Dict[str, Any]:
+        """Décodage avec cache KV, glouton par défaut, borné en nombre de nouveaux tokens."""
+        kwargs: Dict[str, Any] = {
+            "max_new_tokens": min(max_length, self.MAX_NEW_TOKENS),
+            "use_cache": True,
+            "num_beams": 1,
+            "do_sample": self.do_sample,
+            "pad_token_id": self._pad_id,
+            "eos_token_id": self._eos_id,
+        }
+        if self.do_sample:
+            kwargs["temperature"] = temperature
+        return kwargs
 
-        with torch.no_grad():  # type: ignore
-            output_ids = self.model.generate(
-                input_ids,
-                max_length=max_length,
-                temperature=temperature,
-                do_sample=True,
-                pad_token_id=self.tokenizer.pad_token_id,
-                eos_token_id=self.tokenizer.eos_token_id,
-            )
-        return self.tokenizer.decode(output_ids[0], skip_special_tokens=True)
+    def _generate_batch(self, prompts: List[str], max_length: int, temperature: float) -> List[str]:
+        """
+        Un seul generate() pour plusieurs prompts. Padding à droite pour l'encodeur T5,
+        à gauche pour GPT2 (décodeur seul) ; l'attention_mask masque le padding.
+        """
+        is_t5 = self.model_type == "t5"
+        rows = [self._build_input_ids(p, max_tokens=512 if is_t5 else 400)[0] for p in prompts]
+        width = max(len(r) for r in rows)
 
-    def _generate_with_gpt2(self, prompt: str, max_length: int, temperature: float) -> str:
-        input_text = f"UI Configuration: {prompt}\nJSON:"
-        input_ids = self.tokenizer(
-            input_text,
-            return_tensors="pt",
-            max_length=400,
-            truncation=True,
-            padding=True,
-        ).input_ids.to(self.device)
+        input_ids = torch.full((len(rows), width), self._pad_id, dtype=torch.long, device=self.device)  # type: ignore
+        attention_mask = torch.zeros_like(input_ids)  # type: ignore
+        for i, r in enumerate(rows):
+            span = slice(0, len(r)) if is_t5 else slice(width - len(r), width)
+            input_ids[i, span] = r
+            attention_mask[i, span] = 1
 
         with torch.no_grad():  # type: ignore
             output_ids = self.model.generate(
-                input_ids,
-                max_length=max_length,
-                temperature=temperature,
-                do_sample=True,
-                pad_token_id=self.tokenizer.pad_token_id,
-                eos_token_id=self.tokenizer.eos_token_id,
+                input_ids, attention_mask=attention_mask, **self._generation_kwargs(max_length, temperature)
             )
-        generated_ids = output_ids[0][input_ids.shape[1]:]
-        return self.tokenizer.decode(generated_ids, skip_special_tokens=True)
+        if not is_t5:
+            output_ids = output_ids[:, width:]
+        return self.tokenizer.batch_decode(output_ids, skip_special_tokens=True)
+
+    def _generate_with_t5(self, prompt: str, max_length: int, temperature: float) -> str:
+        return self._generate_batch([prompt], max_length, temperature)[0]
+
+    def _generate_with_gpt2(self, prompt: str, max_length: int, temperature: float) -> str:
+        return self._generate_batch([prompt], max_length, temperature)[0]
 
     # ---------- Post-traitement ----------
     def _post_process_generation(
@@ -187,7 +434,7 @@ class EnhancedUIGenerator:
         try:
             cleaned_text = self._clean_generated_text(generated_text)
             if cleaned_text.strip().startswith("{"):
-                config = json.loads(cleaned_text)
+                config = _json_loads(cleaned_text)
             else:
                 config = self._text_to_config(cleaned_text)
         except Exception as e:
@@ -211,43 +458,25 @@ class EnhancedUIGenerator:
 
     def _text_to_config(self, text: str) -> Dict[str, Any]:
         # Config par défaut raisonnable
-        config: Dict[str, Any] = {
-            "theme": "light",
-            "layout": {
-                "type": "standard",
-                "sections": ["header", "content", "footer"],
-            },
-            "colors": {
-                "primary": "#3498db",
-                "secondary": "#2ecc71",
-                "accent": "#e74c3c",
-                "background": "#ffffff",
-                "text": "#2c3e50",
-            },
-            "typography": {
-                "font_family": "Arial, sans-serif",
-                "font_sizes": {"h1": "2rem", "h2": "1.5rem", "body": "1rem"},
-            },
-            "interactions": [],
-            "navigation": {"type": "horizontal", "position": "top"},
-        }
+        config = _blank_config()
 
-        t = text.lower()
-        if any(w in t for w in ["dark", "sombre"]):
+        found = {m.lastgroup for m in _KW_RE.finditer(text)}
+        if "dark" in found:
             config["theme"] = "dark"
             config["colors"]["background"] = "#2c3e50"
             config["colors"]["text"] = "#ecf0f1"
-        if any(w in t for w in ["high contrast", "contraste"]):
+        if "hc" in found:
             config["theme"] = "high_contrast"
-        if any(w in t for w in ["interactive", "interactif", "drag", "touch"]):
+        if "inter" in found:
             config["interactions"] += ["drag_drop", "touch_friendly"]
-        if any(w in t for w in ["help", "aide", "tooltip"]):
+        if "help" in found:
             config["interactions"] += ["help_tooltips", "contextual_assistance"]
-        if any(w in t for w in ["linear", "linéaire", "étape"]):
+        if "lin" in found:
             config["navigation"]["type"] = "linear"
-        elif any(w in t for w in ["hierarchical", "hiérarchique"]):
+        elif "hier" in found:
             config["navigation"]["type"] = "hierarchical"
 
+        config[_VALID_KEY] = _VALID
         return config
 
     def _merge_with_recommendations(
@@ -261,7 +490,8 @@ class EnhancedUIGenerator:
             config["theme"] = recommendations["theme_preference"]
         if "interaction_patterns" in recommendations:
             existing = config.get("interactions", [])
-            config["interactions"] = list(set(existing + recommendations["interaction_patterns"]))
+            # Dédoublonnage qui conserve l'ordre : sortie déterministe
+            config["interactions"] = list(dict.fromkeys((*existing, *recommendations["interaction_patterns"])))
         if "navigation_style" in recommendations:
             config.setdefault("navigation", {})["type"] = recommendations["navigation_style"]
         if "layout_suggestions" in recommendations:
@@ -269,61 +499,33 @@ class EnhancedUIGenerator:
         return config
 
     def _validate_and_complete_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
-        required = ["theme", "layout", "colors", "typography", "interactions", "navigation"]
-        for k in required:
-            config.setdefault(k, {} if k not in ("interactions",) else [])
-        if not isinstance(config["colors"], dict):
-            config["colors"] = {
-                "primary": "#3498db",
-                "secondary": "#2ecc71",
-                "accent": "#e74c3c",
-                "background": "#ffffff",
-                "text": "#2c3e50",
-            }
-        if not isinstance(config["typography"], dict):
-            config["typography"] = {
-                "font_family": "Arial, sans-serif",
-                "font_sizes": {"h1": "2rem", "h2": "1.5rem", "body": "1rem"},
-            }
-        config.setdefault("metadata", {})
-        config["metadata"].update(
-            {
-                "generated_at": datetime.utcnow().isoformat(),
-                "generator": "EnhancedUIGenerator",
-                "version": "1.0",
-                "fallback": self.model is None,
-            }
-        )
+        stamp = {
+            "generated_at": _utcnow_iso(),
+            "generator": "EnhancedUIGenerator",
+            "version": "1.0",
+            "fallback": self.model is None,
+        }
+        # Gabarit issu de _text_to_config : tous les champs sont là, seules les métadonnées manquent
+        if config.pop(_VALID_KEY, None) is _VALID:
+            config["metadata"] = stamp
+            return config
+        # Champ absent ou de mauvais type -> copie de la valeur par défaut
+        for key, typ, default in _SCHEMA:
+            if not isinstance(config.get(key), typ):
+                config[key] = _clone(default)
+        config["metadata"].update(stamp)
         return config
 
     def _get_fallback_config(self, recommendations: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         """Configuration simple mais propre quand aucun modèle n'est dispo."""
-        config = {
-            "theme": "light",
-            "layout": {
-                "type": "standard",
-                "sections": ["header", "content", "footer"],
-                "features": [],
-            },
-            "colors": {
-                "primary": "#3498db",
-                "secondary": "#2ecc71",
-                "accent": "#e74c3c",
-                "background": "#ffffff",
-                "text": "#2c3e50",
-            },
-            "typography": {
-                "font_family": "Arial, sans-serif",
-                "font_sizes": {"h1": "2rem", "h2": "1.5rem", "body": "1rem"},
-            },
-            "interactions": ["basic_click", "hover_effects"],
-            "navigation": {"type": "horizontal", "position": "top"},
-            "metadata": {
-                "generated_at": datetime.utcnow().isoformat(),
-                "generator": "EnhancedUIGenerator",
-                "version": "1.0",
-                "fallback": True,
-            },
+        config = _blank_config()
+        config["layout"]["features"] = []
+        config["interactions"] = ["basic_click", "hover_effects"]
+        config["metadata"] = {
+            "generated_at": _utcnow_iso(),
+            "generator": "EnhancedUIGenerator",
+            "version": "1.0",
+            "fallback": True,
         }
         if recommendations:
             config = self._merge_with_recommendations(config, recommendations)
@@ -333,13 +535,96 @@ class EnhancedUIGenerator:
 # ---------- Adaptateur fonctionnel pour unified_api / tests ----------
 
 __GEN_SINGLETON: Optional[EnhancedUIGenerator] = None
+_GEN_LOCK = threading.Lock()
 
 def _get_generator() -> EnhancedUIGenerator:
     global __GEN_SINGLETON
     if __GEN_SINGLETON is None:
-        __GEN_SINGLETON = EnhancedUIGenerator(model_type="t5", model_name="t5-small")
+        with _GEN_LOCK:
+            if __GEN_SINGLETON is None:
+                __GEN_SINGLETON = EnhancedUIGenerator(model_type="t5", model_name="t5-small")
     return __GEN_SINGLETON
 
+# ---------- Micro-batching des requêtes concurrentes ----------
+
+# Taille maximale d'un lot et fenêtre de regroupement (latence ajoutée au pire)
+MICROBATCH_MAX_SIZE = 8
+MICROBATCH_WINDOW_S = 0.005
+
+
+class _MicroBatcher:
+    """Regroupe les requêtes concurrentes reçues dans une courte fenêtre en un seul generate() batché."""
+
+    def __init__(self, generator: EnhancedUIGenerator,
+                 max_size: int = MICROBATCH_MAX_SIZE, window_s: float = MICROBATCH_WINDOW_S):
+        self.generator = generator
+        self.max_size = max_size
+        self.window_s = window_s
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="uigen-microbatch", daemon=True)
+        self._worker.start()
+
+    def submit(self, text: str, recs: Optional[Dict[str, Any]]) -> Future:
+        future: Future = Future()
+        self._queue.put((text, recs, future))
+        return future
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window_s
+            while len(batch) < self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                configs = self.generator.generate_ui_configs(
+                    [text for text, _, _ in batch],
+                    [recs for _, recs, _ in batch],
+                    max_length=512,
+                    temperature=0.7,
+                )
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, _, future), cfg in zip(batch, configs):
+                future.set_result(cfg)
+
+
+__BATCHER: Optional[_MicroBatcher] = None
+_BATCHER_LOCK = threading.Lock()
+
+def _get_batcher() -> _MicroBatcher:
+    global __BATCHER
+    if __BATCHER is None:
+        with _BATCHER_LOCK:
+            if __BATCHER is None:
+                __BATCHER = _MicroBatcher(_get_generator())
+    return __BATCHER
+
+# Contenus générés mis en cache par (version, modèle, texte, recommandations) : une requête
+# identique ne repasse pas par le modèle (décodage glouton : même entrée -> même sortie).
+# Les configs de repli (fallback) ne sont pas mises en cache.
+CONTENT_CACHE_SIZE = 256
+# À incrémenter quand le format de ui_config (gabarits, _SCHEMA) change
+CONTENT_CACHE_VERSION = 1
+
+_CONTENT_CACHE: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+_CONTENT_CACHE_LOCK = threading.Lock()
+
+
+def _dumps_sorted(obj: Any) -> str:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS).decode()
+    return json.dumps(obj, sort_keys=True, ensure_ascii=False)
+
+
 def generate_content(prompt: Dict[str, Any] | str) -> Dict[str, Any]:
     """
     Utilisé par unified_api et les tests.
@@ -351,8 +636,6 @@ def generate_content(prompt: Dict[str, Any] | str) -> Dict[str, Any]:
       "ui_config": dict
     }
     """
-    gen = _get_generator()
-
     if isinstance(prompt, dict):
         text = str(prompt.get("text", ""))
         recs = prompt.get("recommendations")
@@ -360,13 +643,55 @@ def generate_content(prompt: Dict[str, Any] | str) -> Dict[str, Any]:
         text = str(prompt)
         recs = None
 
-    ui_cfg = gen.generate_ui_config(
-        prompt=text,
-        learner_recommendations=recs,
-        max_length=512,
-        temperature=0.7,
-        num_return_sequences=1,
-    )
+    gen = _get_generator()
+    if gen.do_sample:
+        # Échantillonnage : sorties non déterministes, pas de cache
+        return _generate_content(text, recs)
+
+    # Les recommandations font partie de la clé : un même texte peut venir de profils différents
+    try:
+        recs_key = None if recs is None else _dumps_sorted(recs)
+    except (TypeError, ValueError):
+        return _generate_content(text, recs)
+    key = (CONTENT_CACHE_VERSION, gen.model_type, gen.model_name, text, recs_key)
+
+    with _CONTENT_CACHE_LOCK:
+        cached = _CONTENT_CACHE.get(key)
+        if cached is not None:
+            _CONTENT_CACHE.move_to_end(key)
+    if cached is not None:
+        # Copie : l'appelant peut modifier le résultat sans altérer l'entrée du cache
+        content = _clone(cached)
+        content["ui_config"]["metadata"]["generated_at"] = _utcnow_iso()
+        return content
+
+    content = _generate_content(text, recs)
+    if not content["ui_config"].get("metadata", {}).get("fallback"):
+        with _CONTENT_CACHE_LOCK:
+            _CONTENT_CACHE[key] = _clone(content)
+            if len(_CONTENT_CACHE) > CONTENT_CACHE_SIZE:
+                _CONTENT_CACHE.popitem(last=False)
+    return content
+
+
+def _generate_content(text: str, recs: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    gen = _get_generator()
+
+    # Requêtes triviales (vides, health-checks) : config fallback sans passer par le modèle
+    stripped_len = len(text.strip())
+    if stripped_len < MIN_PROMPT_CHARS or (recs is None and stripped_len < MIN_BARE_PROMPT_CHARS):
+        ui_cfg = gen._get_fallback_config(recs)
+    elif TORCH_AVAILABLE and HF_AVAILABLE and not (gen._loaded and gen.model is None):
+        # Modèle utilisable : passage par le micro-batcher (un generate() pour les requêtes simultanées)
+        ui_cfg = _get_batcher().submit(text, recs).result()
+    else:
+        ui_cfg = gen.generate_ui_config(
+            prompt=text,
+            learner_recommendations=recs,
+            max_length=512,
+            temperature=0.7,
+            num_return_sequences=1,
+        )
 
     return {
         "summary": text[:400],  # mini-résumé basé sur le prompt
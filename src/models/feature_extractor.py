@@ -1,4 +1,9 @@
 # feature_extractor.py
+from typing import Dict, List
+
+import numpy as np
+
+
 def extract_features(conversation: dict) -> dict:
     turns = conversation.get("turns", [])
     texts = [t.get("text","") for t in turns if isinstance(t, dict)]
@@ -7,3 +12,28 @@ def extract_features(conversation: dict) -> dict:
         "avg_turn_len": sum(len(t) for t in texts)/n,
         "question_ratio": sum(1 for t in texts if "?" in t)/n
     }
+
+
+def extract_features_batch(conversations: List[dict]) -> List[Dict[str, float]]:
+    # Réservé aux vrais lots : pour une seule conversation, extract_features est plus rapide
+    # Tous les tours aplatis en deux tableaux (longueurs, présence de "?"),
+    # puis réduction par conversation : un passage Python, le reste en NumPy
+    texts_per_conv = [
+        [t.get("text", "") for t in c.get("turns", []) if isinstance(t, dict)]
+        for c in conversations
+    ]
+    counts = np.fromiter((len(texts) for texts in texts_per_conv), dtype=np.int64, count=len(texts_per_conv))
+    total = int(counts.sum())
+    lengths = np.fromiter((len(t) for texts in texts_per_conv for t in texts), dtype=np.int64, count=total)
+    flags = np.fromiter(("?" in t for texts in texts_per_conv for t in texts), dtype=np.int64, count=total)
+
+    # Index de conversation de chaque tour (bincount gère les conversations sans tour)
+    seg = np.repeat(np.arange(len(conversations)), counts)
+    n = np.maximum(1, counts)
+    avg_len = np.bincount(seg, weights=lengths, minlength=len(conversations)) / n
+    q_ratio = np.bincount(seg, weights=flags, minlength=len(conversations)) / n
+
+    return [
+        {"avg_turn_len": float(a), "question_ratio": float(q)}
+        for a, q in zip(avg_len, q_ratio)
+    ]
@@ -1,16 +1,60 @@
 # profile_generator.py
 from __future__ import annotations
 
+import importlib.util
 import json
+import math
+import threading
+import time
 from dataclasses import dataclass, asdict, field
-from datetime import datetime
-from typing import Dict, List, Tuple, Optional
+from functools import lru_cache
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Tuple, Optional
 
 import numpy as np
 
+# orjson si disponible (export plus rapide, datetime natif), sinon json standard
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None  # type: ignore
+    ORJSON_AVAILABLE = False
+
+# numba si disponible (noyau de similarité compilé), sinon chemin NumPy.
+# Importé seulement au premier calcul de similarité (~250 ms d'import évités sinon).
+NUMBA_AVAILABLE = importlib.util.find_spec("numba") is not None
+
+
+# ========== Horodatage ==========
+# Horloge partagée (profils et métadonnées UI) : UTC naïf, comme datetime.utcnow().
+# (monotonic, datetime, isoformat) réassigné d'un bloc : lecture cohérente entre threads.
+_NOW_CACHE = (float("-inf"), datetime.min, datetime.min.isoformat())
+
+
+def _refresh_now():
+    global _NOW_CACHE
+    m = time.monotonic()
+    cache = _NOW_CACHE
+    if m - cache[0] > 0.5:
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        cache = _NOW_CACHE = (m, now, now.isoformat())
+    return cache
+
+
+def _utcnow() -> datetime:
+    """Date UTC courante (naïve), recalculée au plus toutes les 0,5 s (datetime immuable, partageable)."""
+    return _refresh_now()[1]
+
+
+def _utcnow_iso() -> str:
+    """_utcnow() au format ISO 8601, même cache."""
+    return _refresh_now()[2]
+
 
 # ========== Data classes ==========
-@dataclass
+# slots=True : pas de __dict__ par instance, attributs plus compacts et plus rapides d'accès
+@dataclass(slots=True)
 class LearningStyle:
     visual: float = 0.25
     auditory: float = 0.25
@@ -18,7 +62,7 @@ class LearningStyle:
     kinesthetic: float = 0.25
 
 
-@dataclass
+@dataclass(slots=True)
 class PersonalityProfile:
     # Big-4 mappés aux axes MBTI (E/I, N/S, T/F, J/P) via seuils simples
     extraversion: float = 0.5  # E vs I
@@ -27,7 +71,7 @@ class PersonalityProfile:
     judging: float = 0.5       # J vs P
 
 
-@dataclass
+@dataclass(slots=True)
 class CognitiveProfile:
     processing_speed: float = 0.5
     working_memory: float = 0.5
@@ -36,7 +80,7 @@ class CognitiveProfile:
     attention_span: float = 0.5
 
 
-@dataclass
+@dataclass(slots=True)
 class BehavioralProfile:
     engagement_level: float = 0.5
     persistence: float = 0.5
@@ -45,7 +89,7 @@ class BehavioralProfile:
     self_regulation: float = 0.5
 
 
-@dataclass
+@dataclass(slots=True)
 class LearnerProfile:
     learner_id: str
     learning_style: LearningStyle = field(default_factory=LearningStyle)
@@ -58,21 +102,165 @@ class LearnerProfile:
     recommended_strategies: List[str] = field(default_factory=list)
 
     confidence_level: float = 0.6
-    last_updated: datetime = field(default_factory=datetime.utcnow)
+    last_updated: datetime = field(default_factory=_utcnow)
+
+
+# ========== Lot de profils (Struct-of-Arrays) ==========
+LEARNING_STYLE_FIELDS = ("visual", "auditory", "reading", "kinesthetic")
+PERSONALITY_FIELDS = ("extraversion", "intuition", "thinking", "judging")
+COGNITIVE_FIELDS = ("processing_speed", "working_memory", "analytical_thinking", "creative_thinking", "attention_span")
+BEHAVIORAL_FIELDS = ("engagement_level", "persistence", "help_seeking", "collaboration_preference", "self_regulation")
+
+
+@dataclass
+class ProfileBatch:
+    """
+    N profils rangés par dimension : une ligne par apprenant, une colonne
+    par champ (float64 contigus), pour les traitements vectorisés en lot.
+    """
+    learner_ids: List[str]
+    learning_style: np.ndarray  # (N, 4)
+    personality: np.ndarray     # (N, 4)
+    cognitive: np.ndarray       # (N, 5)
+    behavioral: np.ndarray      # (N, 5)
+
+    @classmethod
+    def from_profiles(cls, profiles: Iterable[LearnerProfile]) -> "ProfileBatch":
+        profiles = list(profiles)
+
+        def _block(attr: str, fields: Tuple[str, ...]) -> np.ndarray:
+            rows = [[getattr(getattr(p, attr), f) for f in fields] for p in profiles]
+            return np.array(rows, dtype=np.float64).reshape(-1, len(fields))
+
+        return cls(
+            learner_ids=[p.learner_id for p in profiles],
+            learning_style=_block("learning_style", LEARNING_STYLE_FIELDS),
+            personality=_block("personality", PERSONALITY_FIELDS),
+            cognitive=_block("cognitive", COGNITIVE_FIELDS),
+            behavioral=_block("behavioral", BEHAVIORAL_FIELDS),
+        )
+
+    def __len__(self) -> int:
+        return len(self.learner_ids)
+
+
+# ========== Vecteurs de profil (similarité) ==========
+_PROFILE_BLOCKS = (
+    ("learning_style", LEARNING_STYLE_FIELDS),
+    ("personality", PERSONALITY_FIELDS),
+    ("cognitive", COGNITIVE_FIELDS),
+    ("behavioral", BEHAVIORAL_FIELDS),
+)
+_BLOCK_TYPES = {
+    "learning_style": LearningStyle,
+    "personality": PersonalityProfile,
+    "cognitive": CognitiveProfile,
+    "behavioral": BehavioralProfile,
+}
+PROFILE_VECTOR_SIZE = sum(len(fields) for _, fields in _PROFILE_BLOCKS)  # 18
+
+# (début, fin, poids, distance max) par bloc : LS 0:4, PR 4:8, CG 8:13, BH 13:18
+_SIMILARITY_BLOCKS = (
+    (0, 4, 0.30, 2.0),            # 4 dims max dist = 2
+    (4, 8, 0.25, 2.0),
+    (8, 13, 0.25, np.sqrt(5)),
+    (13, 18, 0.20, np.sqrt(5)),
+)
+
+
+def _profile_vector(profile: LearnerProfile, dtype=np.float32) -> np.ndarray:
+    """Aplatit les 4 blocs numériques d'un profil en un vecteur (18,) (float32 par défaut)."""
+    return np.array(
+        [getattr(getattr(profile, attr), f) for attr, fields in _PROFILE_BLOCKS for f in fields],
+        dtype=dtype,
+    )
+
+
+def _blocks_from_vector(vec: np.ndarray) -> Dict[str, object]:
+    """Inverse de _profile_vector : {attr: dataclass} reconstruit depuis un vecteur (18,)."""
+    values = vec.tolist()
+    out: Dict[str, object] = {}
+    start = 0
+    for attr, fields in _PROFILE_BLOCKS:
+        end = start + len(fields)
+        out[attr] = _BLOCK_TYPES[attr](**dict(zip(fields, values[start:end])))
+        start = end
+    return out
+
+
+@lru_cache(maxsize=1)
+def _get_sim_kernel():
+    """Importe numba et définit le noyau de similarité au premier appel ; None si indisponible."""
+    if not NUMBA_AVAILABLE:
+        return None
+    try:
+        from numba import njit, prange
+    except ImportError:
+        return None
+
+    @njit(cache=True, fastmath=True, parallel=True)
+    def _sim_kernel(matrix, target, out):
+        sqrt5 = math.sqrt(5.0)
+        for i in prange(matrix.shape[0]):
+            ls = 0.0
+            for j in range(0, 4):
+                d = matrix[i, j] - target[j]
+                ls += d * d
+            pr = 0.0
+            for j in range(4, 8):
+                d = matrix[i, j] - target[j]
+                pr += d * d
+            cg = 0.0
+            for j in range(8, 13):
+                d = matrix[i, j] - target[j]
+                cg += d * d
+            bh = 0.0
+            for j in range(13, 18):
+                d = matrix[i, j] - target[j]
+                bh += d * d
+            overall = (0.30 * (1.0 - math.sqrt(ls) / 2.0)
+                       + 0.25 * (1.0 - math.sqrt(pr) / 2.0)
+                       + 0.25 * (1.0 - math.sqrt(cg) / sqrt5)
+                       + 0.20 * (1.0 - math.sqrt(bh) / sqrt5))
+            out[i] = min(1.0, max(0.0, overall))
+
+    return _sim_kernel
+
+
+def _similarity_scores(matrix: np.ndarray, target: np.ndarray) -> np.ndarray:
+    """Similarité pondérée [0..1] entre chaque ligne de matrix (N, 18) et target (18,)."""
+    kernel = _get_sim_kernel()
+    if kernel is not None:
+        out = np.empty(len(matrix), dtype=np.float32)
+        kernel(matrix, target, out)
+        return out
+    diff = matrix - target
+    overall = np.zeros(len(matrix), dtype=np.float32)
+    for start, end, weight, max_dist in _SIMILARITY_BLOCKS:
+        overall += weight * (1.0 - np.linalg.norm(diff[:, start:end], axis=1) / max_dist)
+    return np.clip(overall, 0.0, 1.0)
 
 
 # ========== Utils ==========
+def _json_default(obj):
+    # dataclasses -> isoformat pour la date (orjson le fait nativement)
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Type non sérialisable: {type(obj).__name__}")
+
+
+def _dumps_pretty(obj) -> str:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj, indent=2, ensure_ascii=False, default=_json_default)
+
+
 def _clip01(x: float) -> float:
     return float(max(0.0, min(1.0, x)))
 
 
-def _merge_learning_style(existing: LearningStyle, new: LearningStyle, weight: float) -> LearningStyle:
-    return LearningStyle(
-        visual=_clip01(existing.visual * (1 - weight) + new.visual * weight),
-        auditory=_clip01(existing.auditory * (1 - weight) + new.auditory * weight),
-        reading=_clip01(existing.reading * (1 - weight) + new.reading * weight),
-        kinesthetic=_clip01(existing.kinesthetic * (1 - weight) + new.kinesthetic * weight),
-    )
+def _blend(a: np.ndarray, b: np.ndarray, w: float) -> np.ndarray:
+    return np.clip(a * (1 - w) + b * w, 0.0, 1.0)
 
 
 def _infer_vark_from_learning_style(ls: LearningStyle) -> Tuple[str, Dict[str, float]]:
@@ -124,47 +312,106 @@ class ProfileGenerator:
     """
     def __init__(self):
         self.profile_cache: Dict[str, LearnerProfile] = {}
+        # Matrice SoA des profils en cache (une ligne par apprenant), tenue à jour par set()
+        self._feat_matrix = np.zeros((16, PROFILE_VECTOR_SIZE), dtype=np.float32)
+        self._id_to_row: Dict[str, int] = {}
+        self._row_ids: List[str] = []
+        self._row_profiles: List[LearnerProfile] = []
+        # Protège cache + matrice + index (generate_profile est appelé depuis plusieurs threads)
+        self._lock = threading.RLock()
 
     # ---------- CRUD Cache ----------
     def get(self, learner_id: str) -> Optional[LearnerProfile]:
         return self.profile_cache.get(learner_id)
 
     def set(self, profile: LearnerProfile) -> None:
-        profile.last_updated = datetime.utcnow()
-        self.profile_cache[profile.learner_id] = profile
+        profile.last_updated = _utcnow()
+        with self._lock:
+            self.profile_cache[profile.learner_id] = profile
+            self._write_feature_row(profile.learner_id, profile)
+
+    def _write_feature_row(self, learner_id: str, profile: LearnerProfile) -> None:
+        # Appelant détient self._lock
+        row = self._id_to_row.get(learner_id)
+        if row is None:
+            row = len(self._row_ids)
+            if row == len(self._feat_matrix):
+                grown = np.zeros((2 * len(self._feat_matrix), PROFILE_VECTOR_SIZE), dtype=np.float32)
+                grown[:row] = self._feat_matrix
+                self._feat_matrix = grown
+            self._id_to_row[learner_id] = row
+            self._row_ids.append(learner_id)
+            self._row_profiles.append(profile)
+        else:
+            self._row_profiles[row] = profile
+        self._feat_matrix[row] = _profile_vector(profile)
+
+    def _sync_feature_matrix(self) -> None:
+        # Appelant détient self._lock.
+        # Si profile_cache a été modifié sans passer par set() (ajout, suppression ou
+        # remplacement direct), les lignes ne correspondent plus : reconstruction complète.
+        cache = self.profile_cache
+        if len(self._row_ids) == len(cache) and all(
+            cache.get(lid) is p for lid, p in zip(self._row_ids, self._row_profiles)
+        ):
+            return
+        self._id_to_row = {}
+        self._row_ids = []
+        self._row_profiles = []
+        for learner_id, profile in cache.items():
+            self._write_feature_row(learner_id, profile)
+
+    # ---------- Génération depuis l'historique ----------
+    def generate_profile_from_records(self, records: List[Dict]) -> LearnerProfile:
+        """
+        Construit un LearnerProfile directement depuis une liste d'échanges
+        ({"user_input", "bot_response", "timestamp", "session_id"}), sans DataFrame.
+        Le profil est fusionné avec celui déjà en cache pour la même session.
+        """
+        learner_id = "anonymous"
+        n = 0
+        questions = 0
+        for rec in records:
+            learner_id = rec.get("session_id") or learner_id
+            text = rec.get("user_input") or ""
+            n += 1
+            questions += "?" in text
+        n = max(1, n)
+
+        profile = LearnerProfile(learner_id=learner_id)
+        profile.behavioral.help_seeking = _clip01(questions / n)
+        return self.merge_into_cache(profile)
+
+    def merge_into_cache(self, profile: LearnerProfile) -> LearnerProfile:
+        """
+        Fusionne profile avec celui déjà en cache pour le même apprenant, enregistre
+        et retourne le résultat (ex. profils calculés dans d'autres processus).
+        """
+        # Lecture / fusion / écriture atomiques pour une même session
+        with self._lock:
+            existing = self.get(profile.learner_id)
+            if existing is not None:
+                profile = self.merge_profiles(existing, profile)
+            self.set(profile)
+        return profile
+
+    def generate_profile(self, df) -> LearnerProfile:
+        """
+        Variante tabulaire : accepte un DataFrame polars (to_dicts) ou pandas
+        (to_dict("records")) et délègue à generate_profile_from_records.
+        """
+        if hasattr(df, "to_dicts"):
+            return self.generate_profile_from_records(df.to_dicts())
+        return self.generate_profile_from_records(df.to_dict("records"))
 
     # ---------- Fusion ----------
     def merge_profiles(self, existing: LearnerProfile, new: LearnerProfile, weight: float = 0.5) -> LearnerProfile:
         weight = _clip01(weight)
 
-        # Learning style
-        merged_learning_style = _merge_learning_style(existing.learning_style, new.learning_style, weight)
-
-        # Personality
-        merged_personality = PersonalityProfile(
-            extraversion=_clip01(existing.personality.extraversion * (1 - weight) + new.personality.extraversion * weight),
-            intuition=_clip01(existing.personality.intuition * (1 - weight) + new.personality.intuition * weight),
-            thinking=_clip01(existing.personality.thinking * (1 - weight) + new.personality.thinking * weight),
-            judging=_clip01(existing.personality.judging * (1 - weight) + new.personality.judging * weight),
-        )
-
-        # Cognitive
-        merged_cognitive = CognitiveProfile(
-            processing_speed=_clip01(existing.cognitive.processing_speed * (1 - weight) + new.cognitive.processing_speed * weight),
-            working_memory=_clip01(existing.cognitive.working_memory * (1 - weight) + new.cognitive.working_memory * weight),
-            analytical_thinking=_clip01(existing.cognitive.analytical_thinking * (1 - weight) + new.cognitive.analytical_thinking * weight),
-            creative_thinking=_clip01(existing.cognitive.creative_thinking * (1 - weight) + new.cognitive.creative_thinking * weight),
-            attention_span=_clip01(existing.cognitive.attention_span * (1 - weight) + new.cognitive.attention_span * weight),
-        )
-
-        # Behavioral
-        merged_behavioral = BehavioralProfile(
-            engagement_level=_clip01(existing.behavioral.engagement_level * (1 - weight) + new.behavioral.engagement_level * weight),
-            persistence=_clip01(existing.behavioral.persistence * (1 - weight) + new.behavioral.persistence * weight),
-            help_seeking=_clip01(existing.behavioral.help_seeking * (1 - weight) + new.behavioral.help_seeking * weight),
-            collaboration_preference=_clip01(existing.behavioral.collaboration_preference * (1 - weight) + new.behavioral.collaboration_preference * weight),
-            self_regulation=_clip01(existing.behavioral.self_regulation * (1 - weight) + new.behavioral.self_regulation * weight),
-        )
+        # Learning style / personality / cognitive / behavioral : un seul mélange vectorisé (18,)
+        merged = _blocks_from_vector(_blend(
+            _profile_vector(existing, np.float64), _profile_vector(new, np.float64), weight
+        ))
 
         # Listes (dédupliquées mais ordonnées)
         def _dedup_keep_order(seq: List[str]) -> List[str]:
@@ -183,16 +430,16 @@ class ProfileGenerator:
 
         lp = LearnerProfile(
             learner_id=existing.learner_id,
-            learning_style=merged_learning_style,
-            personality=merged_personality,
-            cognitive=merged_cognitive,
-            behavioral=merged_behavioral,
+            learning_style=merged["learning_style"],
+            personality=merged["personality"],
+            cognitive=merged["cognitive"],
+            behavioral=merged["behavioral"],
             difficulty_areas=merged_difficulties,
             strengths=merged_strengths,
             recommended_strategies=merged_recommendations,
             confidence_level=merged_confidence,
         )
-        lp.last_updated = datetime.utcnow()
+        lp.last_updated = _utcnow()
         return lp
 
     # ---------- Export ----------
@@ -201,48 +448,33 @@ class ProfileGenerator:
             return ""
         profile = self.profile_cache[learner_id]
         if fmt.lower() == "json":
-            d = asdict(profile)
-            # dataclasses -> isoformat pour la date
-            d["last_updated"] = profile.last_updated.isoformat()
-            return json.dumps(d, indent=2, ensure_ascii=False)
+            return _dumps_pretty(asdict(profile))
         return ""
 
     # ---------- Similarité ----------
     def _calculate_profile_similarity(self, p1: LearnerProfile, p2: LearnerProfile) -> float:
-        # Learning style
-        ls1 = np.array([p1.learning_style.visual, p1.learning_style.auditory, p1.learning_style.reading, p1.learning_style.kinesthetic], dtype=float)
-        ls2 = np.array([p2.learning_style.visual, p2.learning_style.auditory, p2.learning_style.reading, p2.learning_style.kinesthetic], dtype=float)
-        ls_sim = 1.0 - np.linalg.norm(ls1 - ls2) / 2.0  # 4 dims max dist = 2
-
-        # Personality
-        pr1 = np.array([p1.personality.extraversion, p1.personality.intuition, p1.personality.thinking, p1.personality.judging], dtype=float)
-        pr2 = np.array([p2.personality.extraversion, p2.personality.intuition, p2.personality.thinking, p2.personality.judging], dtype=float)
-        pr_sim = 1.0 - np.linalg.norm(pr1 - pr2) / 2.0  # 4 dims max dist = 2
-
-        # Cognitive (5 dims)
-        cg1 = np.array([p1.cognitive.processing_speed, p1.cognitive.working_memory, p1.cognitive.analytical_thinking, p1.cognitive.creative_thinking, p1.cognitive.attention_span], dtype=float)
-        cg2 = np.array([p2.cognitive.processing_speed, p2.cognitive.working_memory, p2.cognitive.analytical_thinking, p2.cognitive.creative_thinking, p2.cognitive.attention_span], dtype=float)
-        cg_sim = 1.0 - np.linalg.norm(cg1 - cg2) / np.sqrt(5)
-
-        # Behavioral (5 dims)
-        bh1 = np.array([p1.behavioral.engagement_level, p1.behavioral.persistence, p1.behavioral.help_seeking, p1.behavioral.collaboration_preference, p1.behavioral.self_regulation], dtype=float)
-        bh2 = np.array([p2.behavioral.engagement_level, p2.behavioral.persistence, p2.behavioral.help_seeking, p2.behavioral.collaboration_preference, p2.behavioral.self_regulation], dtype=float)
-        bh_sim = 1.0 - np.linalg.norm(bh1 - bh2) / np.sqrt(5)
-
-        overall = (0.30 * ls_sim) + (0.25 * pr_sim) + (0.25 * cg_sim) + (0.20 * bh_sim)
-        return float(max(0.0, min(1.0, overall)))
+        return float(_similarity_scores(_profile_vector(p1)[None, :], _profile_vector(p2))[0])
 
     def get_similar_learners(self, learner_id: str, n_similar: int = 5) -> List[str]:
-        if learner_id not in self.profile_cache or len(self.profile_cache) < 2:
-            return []
-        target = self.profile_cache[learner_id]
-        sims: List[Tuple[str, float]] = []
-        for other_id, other_prof in self.profile_cache.items():
-            if other_id == learner_id:
-                continue
-            sims.append((other_id, self._calculate_profile_similarity(target, other_prof)))
-        sims.sort(key=lambda x: x[1], reverse=True)
-        return [lid for lid, _ in sims[:n_similar]]
+        with self._lock:
+            if learner_id not in self.profile_cache or len(self.profile_cache) < 2:
+                return []
+            self._sync_feature_matrix()
+            n = len(self._row_ids)
+            k = min(n_similar, n - 1)
+            if k <= 0:
+                return []
+
+            # Un seul passage vectorisé sur toute la matrice, puis top-k partiel
+            matrix = self._feat_matrix[:n]
+            row = self._id_to_row[learner_id]
+            scores = _similarity_scores(matrix, matrix[row])
+            row_ids = list(self._row_ids)
+        scores[row] = -np.inf
+        top = np.argpartition(-scores, k - 1)[:k]
+        # Score décroissant, puis ordre d'insertion en cas d'égalité
+        top = top[np.lexsort((top, -scores[top]))]
+        return [row_ids[i] for i in top]
 
 
 # ========== Entrée contractuelle pour l’API ==========
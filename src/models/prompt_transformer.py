@@ -3,142 +3,180 @@ Module de transformation de profil d'apprenant en prompt pour l'IA générative.
 Ce module fait le lien entre le système de profilage NLP et le système de personnalisation UI.
 """
 
-from typing import Dict, List, Any
+from types import MappingProxyType
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import asdict
 
+import numpy as np
+
 from .profile_generator import (
     LearnerProfile,
+    ProfileBatch,
     LearningStyle,
     PersonalityProfile,
     CognitiveProfile,
     BehavioralProfile,
+    LEARNING_STYLE_FIELDS,
+    PERSONALITY_FIELDS,
+)
+
+
+# Phrases fixes du prompt
+_LOW_CONFIDENCE_HINT = "Privilégier une interface simple et rassurante avec des guides étape par étape."
+_HIGH_CONFIDENCE_HINT = "Permettre une interface avancée avec des options de personnalisation étendues."
+_PROMPT_FOOTER = (
+    "La configuration doit inclure le thème, la mise en page, la palette de couleurs "
+    "et les éléments interactifs recommandés."
+)
+
+# Descriptions VARK dans l'ordre de LEARNING_STYLE_FIELDS (visual, auditory, reading, kinesthetic)
+_VARK_DESCRIPTIONS = ('visuel', 'auditif', 'lecture/écriture', 'kinesthésique')
+
+# Règles de seuil : (attribut, seuil bas, libellé bas, seuil haut, libellé haut).
+# Libellé bas None : seul le côté haut produit un libellé.
+_PERSONALITY_RULES = (
+    ("extraversion", 0.4, "introverti", 0.6, "extraverti"),
+    ("intuition", 0.4, "concret", 0.6, "intuitif"),
+    ("thinking", 0.4, "empathique", 0.6, "analytique"),
+    ("judging", 0.4, "flexible", 0.6, "organisé"),
+)
+_COGNITIVE_RULES = (
+    ("processing_speed", 0.3, "traitement réfléchi", 0.7, "traitement rapide"),
+    ("working_memory", 0.3, "mémoire de travail limitée", 0.7, "bonne mémoire de travail"),
+    ("analytical_thinking", 0.3, None, 0.7, "forte capacité analytique"),
+    ("creative_thinking", 0.3, None, 0.7, "pensée créative développée"),
+    ("attention_span", 0.3, "attention limitée", 0.7, "bonne capacité d'attention"),
 )
+_BEHAVIORAL_RULES = (
+    ("engagement_level", 0.3, "engagement faible", 0.7, "très engagé"),
+    ("persistence", 0.3, "abandonne facilement", 0.7, "persistant"),
+    ("help_seeking", 0.3, "autonome", 0.7, "demande souvent de l'aide"),
+    ("collaboration_preference", 0.3, "préfère le travail individuel", 0.7, "préfère le travail collaboratif"),
+    ("self_regulation", 0.3, "autorégulation faible", 0.7, "bonne autorégulation"),
+)
+
 
+def _threshold_labels(obj: Any, rules: Tuple[Tuple[str, float, Optional[str], float, str], ...]) -> List[str]:
+    """Un libellé par attribut hors de la zone neutre [seuil bas, seuil haut], dans l'ordre des règles."""
+    labels = []
+    append = labels.append  # méthode liée une fois pour toute la boucle
+    for attr, low, low_label, high, high_label in rules:
+        value = getattr(obj, attr)
+        if value > high:
+            append(high_label)
+        elif low_label is not None and value < low:
+            append(low_label)
+    return labels
+
+# Recommandations UI : palette de base, et pour le calcul en lot les libellés
+# associés à chaque condition de _get_layout_suggestions / _get_interaction_patterns /
+# _get_color_recommendations (même ordre que les if de ces méthodes)
+_BASE_COLORS = MappingProxyType({
+    "primary": "#3498db",
+    "secondary": "#2ecc71",
+    "accent": "#e74c3c",
+    "background": "#ffffff",
+    "text": "#2c3e50",
+})
+_LAYOUT_GROUPS = (
+    ("visual_hierarchy", "image_heavy", "infographics"),
+    ("interactive_elements", "drag_drop", "touch_friendly"),
+    ("minimal_design", "focused_content", "progress_indicators"),
+    ("structured_layout", "clear_sections", "navigation_breadcrumbs"),
+)
+_INTERACTION_GROUPS = (
+    ("social_features", "collaboration_tools", "sharing_options"),
+    ("help_tooltips", "contextual_assistance", "tutorial_mode"),
+    ("guided_workflow", "automatic_save", "reminder_system"),
+)
+_COLOR_OVERRIDES = (("accent", "#f39c12"), ("secondary", "#9b59b6"), ("primary", "#27ae60"))
 
 
 class PromptTransformer:
     """Transforme un LearnerProfile en prompt textuel pour l'IA générative"""
-    
+
+    # Tables constantes : construites une fois à l'import, partagées par toutes les instances
+    vark_descriptions = MappingProxyType(dict(zip(LEARNING_STYLE_FIELDS, _VARK_DESCRIPTIONS)))
+
+    mbti_descriptions = MappingProxyType({
+        'extraversion': ('extraverti', 'introverti'),
+        'intuition': ('intuitif', 'concret'),
+        'thinking': ('analytique', 'empathique'),
+        'judging': ('organisé', 'flexible')
+    })
+
     def __init__(self):
-        self.vark_descriptions = {
-            'visual': 'visuel',
-            'auditory': 'auditif', 
-            'reading': 'lecture/écriture',
-            'kinesthetic': 'kinesthésique'
-        }
-        
-        self.mbti_descriptions = {
-            'extraversion': ('extraverti', 'introverti'),
-            'intuition': ('intuitif', 'concret'),
-            'thinking': ('analytique', 'empathique'),
-            'judging': ('organisé', 'flexible')
-        }
-    
+        # Cache propre à l'instance : une sous-classe qui redéfinit un _get_* a ses propres rendus
+        self._render_cached = lru_cache(maxsize=RENDER_CACHE_SIZE)(self._render_key)
+
+    def _render(self, profile: LearnerProfile) -> Tuple[str, Dict[str, Any]]:
+        """(prompt, recommandations) mémoïsés ; le dict retourné ne doit pas être modifié."""
+        key = _profile_key(profile)
+        try:
+            hash(key)
+        except TypeError:
+            # Forces/difficultés non hachables : rendu direct, sans cache
+            return self._render_prompt(profile), self._render_recommendations(profile)
+        return self._render_cached(key)
+
+    def _render_key(self, key: tuple) -> Tuple[str, Dict[str, Any]]:
+        profile = _profile_from_key(key)
+        return self._render_prompt(profile), self._render_recommendations(profile)
+
     def profile_to_prompt(self, profile: LearnerProfile) -> str:
         """
         Convertit un LearnerProfile en prompt textuel structuré pour l'IA générative.
+        Mémoïsé : deux profils aux valeurs identiques partagent le même rendu.
         """
-        learning_style_text = self._get_dominant_learning_style(profile.learning_style)
-        personality_text = self._get_personality_traits(profile.personality)
-        cognitive_text = self._get_cognitive_characteristics(profile.cognitive)
-        behavioral_text = self._get_behavioral_patterns(profile.behavioral)
-        strengths_text = self._format_strengths(profile.strengths)
-        difficulties_text = self._format_difficulties(profile.difficulty_areas)
-        
-        prompt = self._build_comprehensive_prompt(
-            learning_style_text,
-            personality_text,
-            cognitive_text,
-            behavioral_text,
-            strengths_text,
-            difficulties_text,
+        return self._render(profile)[0]
+
+    def _render_prompt(self, profile: LearnerProfile) -> str:
+        # Chaque sous-profil est lu une fois, puis passé tel quel aux helpers
+        ls, pers, cog, beh = profile.learning_style, profile.personality, profile.cognitive, profile.behavioral
+        return self._build_comprehensive_prompt(
+            self._get_dominant_learning_style(ls),
+            self._get_personality_traits(pers),
+            self._get_cognitive_characteristics(cog),
+            self._get_behavioral_patterns(beh),
+            self._format_strengths(profile.strengths),
+            self._format_difficulties(profile.difficulty_areas),
             profile.confidence_level
         )
-        return prompt
     
     def _get_dominant_learning_style(self, learning_style: LearningStyle) -> str:
-        styles = {
-            'visual': learning_style.visual,
-            'auditory': learning_style.auditory,
-            'reading': learning_style.reading,
-            'kinesthetic': learning_style.kinesthetic
-        }
-        sorted_styles = sorted(styles.items(), key=lambda x: x[1], reverse=True)
-        dominant_style = sorted_styles[0][0]
-        secondary_styles = [s for s, score in sorted_styles[1:] if score > 0.2]
-
-        text = f"apprenant principalement {self.vark_descriptions[dominant_style]}"
-        if secondary_styles:
-            secondary_desc = [self.vark_descriptions[s] for s in secondary_styles]
-            text += f" avec des tendances {' et '.join(secondary_desc)}"
-        return text
+        scores = (learning_style.visual, learning_style.auditory, learning_style.reading, learning_style.kinesthetic)
+        score = scores.__getitem__
+        descriptions = _VARK_DESCRIPTIONS
+        # argmax : premier maximum, comme le tri stable d'origine
+        dominant = max(range(4), key=score)
+        # Styles secondaires par score décroissant (ordre d'origine à égalité)
+        secondary = sorted(
+            (i for i in range(4) if i != dominant and score(i) > 0.2),
+            key=score,
+            reverse=True,
+        )
+
+        dominant_desc = descriptions[dominant]
+        if secondary:
+            secondary_desc = ' et '.join(descriptions[i] for i in secondary)
+            return f"apprenant principalement {dominant_desc} avec des tendances {secondary_desc}"
+        return f"apprenant principalement {dominant_desc}"
     
     def _get_personality_traits(self, personality: PersonalityProfile) -> str:
-        traits = []
-        if personality.extraversion > 0.6:
-            traits.append("extraverti")
-        elif personality.extraversion < 0.4:
-            traits.append("introverti")
-        if personality.intuition > 0.6:
-            traits.append("intuitif")
-        elif personality.intuition < 0.4:
-            traits.append("concret")
-        if personality.thinking > 0.6:
-            traits.append("analytique")
-        elif personality.thinking < 0.4:
-            traits.append("empathique")
-        if personality.judging > 0.6:
-            traits.append("organisé")
-        elif personality.judging < 0.4:
-            traits.append("flexible")
+        traits = _threshold_labels(personality, _PERSONALITY_RULES)
         if traits:
             return f"de personnalité {', '.join(traits)}"
         return "de personnalité équilibrée"
     
     def _get_cognitive_characteristics(self, cognitive: CognitiveProfile) -> str:
-        characteristics = []
-        if cognitive.processing_speed > 0.7:
-            characteristics.append("traitement rapide")
-        elif cognitive.processing_speed < 0.3:
-            characteristics.append("traitement réfléchi")
-        if cognitive.working_memory > 0.7:
-            characteristics.append("bonne mémoire de travail")
-        elif cognitive.working_memory < 0.3:
-            characteristics.append("mémoire de travail limitée")
-        if cognitive.analytical_thinking > 0.7:
-            characteristics.append("forte capacité analytique")
-        if cognitive.creative_thinking > 0.7:
-            characteristics.append("pensée créative développée")
-        if cognitive.attention_span > 0.7:
-            characteristics.append("bonne capacité d'attention")
-        elif cognitive.attention_span < 0.3:
-            characteristics.append("attention limitée")
+        characteristics = _threshold_labels(cognitive, _COGNITIVE_RULES)
         if characteristics:
             return f"avec {', '.join(characteristics)}"
         return "avec des capacités cognitives moyennes"
     
     def _get_behavioral_patterns(self, behavioral: BehavioralProfile) -> str:
-        patterns = []
-        if behavioral.engagement_level > 0.7:
-            patterns.append("très engagé")
-        elif behavioral.engagement_level < 0.3:
-            patterns.append("engagement faible")
-        if behavioral.persistence > 0.7:
-            patterns.append("persistant")
-        elif behavioral.persistence < 0.3:
-            patterns.append("abandonne facilement")
-        if behavioral.help_seeking > 0.7:
-            patterns.append("demande souvent de l'aide")
-        elif behavioral.help_seeking < 0.3:
-            patterns.append("autonome")
-        if behavioral.collaboration_preference > 0.7:
-            patterns.append("préfère le travail collaboratif")
-        elif behavioral.collaboration_preference < 0.3:
-            patterns.append("préfère le travail individuel")
-        if behavioral.self_regulation > 0.7:
-            patterns.append("bonne autorégulation")
-        elif behavioral.self_regulation < 0.3:
-            patterns.append("autorégulation faible")
+        patterns = _threshold_labels(behavioral, _BEHAVIORAL_RULES)
         if patterns:
             return f"Il est {', '.join(patterns)}"
         return "Il présente des comportements d'apprentissage équilibrés"
@@ -163,29 +201,78 @@ class PromptTransformer:
         difficulties: str,
         confidence: float
     ) -> str:
-        base_prompt = (
+        # Fragments collectés puis assemblés en un seul join (pas de += successifs)
+        parts = [
             f"Générer une configuration UI/UX personnalisée pour un "
             f"{learning_style} {personality} {cognitive}. {behavioral}."
-        )
-        context_parts = []
-        if strengths:
-            context_parts.append(strengths)
-        if difficulties:
-            context_parts.append(difficulties)
-        if context_parts:
-            base_prompt += f" {' '.join(context_parts)}."
+        ]
+        if strengths and difficulties:
+            parts.append(f"{strengths} {difficulties}.")
+        elif strengths or difficulties:
+            parts.append(f"{strengths or difficulties}.")
         if confidence < 0.3:
-            base_prompt += " Privilégier une interface simple et rassurante avec des guides étape par étape."
+            parts.append(_LOW_CONFIDENCE_HINT)
         elif confidence > 0.7:
-            base_prompt += " Permettre une interface avancée avec des options de personnalisation étendues."
-        base_prompt += (
-            " La configuration doit inclure le thème, la mise en page, la palette de couleurs "
-            "et les éléments interactifs recommandés."
-        )
-        return base_prompt
+            parts.append(_HIGH_CONFIDENCE_HINT)
+        parts.append(_PROMPT_FOOTER)
+        return " ".join(parts)
     
     # -------- Recos structurées (inchangé) --------
     def generate_ui_recommendations(self, profile: LearnerProfile) -> Dict[str, Any]:
+        # Copie des listes/dicts : l'appelant peut modifier le résultat sans toucher au cache
+        recs = self._render(profile)[1]
+        return {k: v.copy() if isinstance(v, (list, dict)) else v for k, v in recs.items()}
+
+    def generate_ui_recommendations_batch(self, profiles: List[LearnerProfile]) -> List[Dict[str, Any]]:
+        """
+        Version en lot (recalculs admin) : les seuils de _get_* sont évalués en NumPy
+        sur les colonnes d'un ProfileBatch, puis un dict de recommandations par profil.
+        """
+        batch = ProfileBatch.from_profiles(profiles)
+        if not len(batch):
+            return []
+        ls, pers, cog, beh = batch.learning_style, batch.personality, batch.cognitive, batch.behavioral
+        visual, kinesthetic = ls[:, 0], ls[:, 3]
+        extraversion, judging = pers[:, 0], pers[:, 3]
+        creative, attention = cog[:, 3], cog[:, 4]
+        engagement, help_seeking, self_regulation = beh[:, 0], beh[:, 2], beh[:, 4]
+
+        themes = np.where(visual > 0.5, "high_contrast", np.where(extraversion < 0.4, "dark", "light")).tolist()
+        navigation = np.select(
+            [attention < 0.4, judging < 0.4, judging > 0.6],
+            ["linear", "free_form", "hierarchical"],
+            "standard",
+        ).tolist()
+        layout_masks = np.column_stack(
+            (visual > 0.5, kinesthetic > 0.5, attention < 0.4, judging > 0.6)
+        ).tolist()
+        interaction_masks = np.column_stack(
+            (extraversion > 0.6, help_seeking > 0.6, self_regulation < 0.4)
+        ).tolist()
+        color_masks = np.column_stack(
+            (extraversion > 0.6, creative > 0.6, engagement < 0.4)
+        ).tolist()
+
+        results = []
+        for i in range(len(batch)):
+            colors = dict(_BASE_COLORS)
+            for hit, (key, value) in zip(color_masks[i], _COLOR_OVERRIDES):
+                if hit:
+                    colors[key] = value
+            results.append({
+                "theme_preference": themes[i],
+                "layout_suggestions": [
+                    label for hit, group in zip(layout_masks[i], _LAYOUT_GROUPS) if hit for label in group
+                ],
+                "interaction_patterns": [
+                    label for hit, group in zip(interaction_masks[i], _INTERACTION_GROUPS) if hit for label in group
+                ],
+                "color_psychology": colors,
+                "navigation_style": navigation[i],
+            })
+        return results
+
+    def _render_recommendations(self, profile: LearnerProfile) -> Dict[str, Any]:
         return {
             "theme_preference": self._get_theme_preference(profile),
             "layout_suggestions": self._get_layout_suggestions(profile),
@@ -224,13 +311,7 @@ class PromptTransformer:
         return patterns
     
     def _get_color_recommendations(self, profile: LearnerProfile) -> Dict[str, str]:
-        colors = {
-            "primary": "#3498db",
-            "secondary": "#2ecc71",
-            "accent": "#e74c3c",
-            "background": "#ffffff",
-            "text": "#2c3e50",
-        }
+        colors = dict(_BASE_COLORS)
         if profile.personality.extraversion > 0.6:
             colors["accent"] = "#f39c12"
         if profile.cognitive.creative_thinking > 0.6:
@@ -249,63 +330,114 @@ class PromptTransformer:
         return "standard"
 
 
+# ================== CACHE DES RENDUS ==================
+
+# Nombre de rendus (prompt, recommandations) conservés par instance
+RENDER_CACHE_SIZE = 1024
+
+
+def _profile_key(profile: LearnerProfile) -> tuple:
+    """Valeurs exactes (pas d'arrondi : un arrondi ferait franchir les seuils 0.3/0.4/0.5/0.6/0.7) utilisées par le prompt."""
+    ls, pers, cog, beh = profile.learning_style, profile.personality, profile.cognitive, profile.behavioral
+    return (
+        ls.visual, ls.auditory, ls.reading, ls.kinesthetic,
+        pers.extraversion, pers.intuition, pers.thinking, pers.judging,
+        cog.processing_speed, cog.working_memory, cog.analytical_thinking,
+        cog.creative_thinking, cog.attention_span,
+        beh.engagement_level, beh.persistence, beh.help_seeking,
+        beh.collaboration_preference, beh.self_regulation,
+        profile.confidence_level,
+        tuple(profile.strengths),
+        tuple(profile.difficulty_areas),
+    )
+
+
+def _profile_from_key(key: tuple) -> LearnerProfile:
+    return LearnerProfile(
+        learner_id="cache",
+        learning_style=LearningStyle(*key[0:4]),
+        personality=PersonalityProfile(*key[4:8]),
+        cognitive=CognitiveProfile(*key[8:13]),
+        behavioral=BehavioralProfile(*key[13:18]),
+        confidence_level=key[18],
+        strengths=list(key[19]),
+        difficulty_areas=list(key[20]),
+    )
+
+
+# Sans état hormis son cache : une seule instance partagée par l'adaptateur
+_TRANSFORMER = PromptTransformer()
+
+
 # ================== ADAPTATEUR POUR unified_api ==================
 
+# Surcharges depuis les features : (clé de feature, attribut)
+_LS_FEATURES = tuple((f"ls_{attr}", attr) for attr in LEARNING_STYLE_FIELDS)
+_PERS_FEATURES = tuple((f"pers_{attr}", attr) for attr in PERSONALITY_FIELDS)
+
+
+# Scores (visual, auditory, reading, kinesthetic) par label VARK : 0.65 sur le style, le reste réparti
+_VARK_BOOST = 0.65
+_VARK_REST = (1.0 - _VARK_BOOST) / 3.0
+_VARK_TABLE = {
+    label: tuple(_VARK_BOOST if i == pos else _VARK_REST for i in range(4))
+    for pos, label in enumerate("VARK")
+}
+
+
 def _vark_to_learning_style(vark_label: str, base: LearningStyle | None = None) -> LearningStyle:
     ls = base or LearningStyle()
-    label = (vark_label or "").upper()
-    boost = 0.65
-    rest = (1.0 - boost) / 3.0
-    if label == "V":
-        ls.visual, ls.auditory, ls.reading, ls.kinesthetic = boost, rest, rest, rest
-    elif label == "A":
-        ls.visual, ls.auditory, ls.reading, ls.kinesthetic = rest, boost, rest, rest
-    elif label == "R":
-        ls.visual, ls.auditory, ls.reading, ls.kinesthetic = rest, rest, boost, rest
-    elif label == "K":
-        ls.visual, ls.auditory, ls.reading, ls.kinesthetic = rest, rest, rest, boost
+    # Label inconnu : scores inchangés
+    vals = _VARK_TABLE.get((vark_label or "").upper())
+    if vals is not None:
+        ls.visual, ls.auditory, ls.reading, ls.kinesthetic = vals
     return ls
 
+def _mbti_scores(code: str) -> Tuple[float, float, float, float]:
+    """(extraversion, intuition, thinking, judging) : 0.75 si la lettre E/N/T/J est à sa place, sinon 0.25."""
+    return tuple(0.75 if code[i:i + 1] == letter else 0.25 for i, letter in enumerate("ENTJ"))
+
+
+# Les 16 codes MBTI précalculés : un seul accès dict dans le cas courant
+_MBTI_TABLE = {
+    code: _mbti_scores(code)
+    for code in (e + n + t + j for e in "EI" for n in "NS" for t in "TF" for j in "JP")
+}
+
+
 def _mbti_to_personality(mbti: str, base: PersonalityProfile | None = None) -> PersonalityProfile:
     p = base or PersonalityProfile()
-    code = (mbti or "").upper()
-    p.extraversion = 0.75 if code[:1] == "E" else 0.25
-    p.intuition    = 0.75 if code[1:2] == "N" else 0.25
-    p.thinking     = 0.75 if code[2:3] == "T" else 0.25
-    p.judging      = 0.75 if code[3:4] == "J" else 0.25
+    code = mbti or ""
+    vals = _MBTI_TABLE.get(code)
+    if vals is None:
+        # Minuscules ou code partiel / non standard : calcul lettre par lettre
+        vals = _mbti_scores(code.upper())
+    p.extraversion, p.intuition, p.thinking, p.judging = vals
     return p
 
 def build_prompt_from_profiles(
     goal: str,
     lang: str,
     level: str,
-    profiles: Dict[str, Any],
+    vark_label: Optional[str],
+    mbti_label: Optional[str],
     features: Dict[str, Any],
     ui: Dict[str, Any],
 ) -> Dict[str, Any]:
     """
     Utilisé par unified_api.py :
-    construi un prompt textuel + recommandations UI à partir de VARK/MBTI + features + contraintes UI.
+    construi un prompt textuel + recommandations UI à partir des labels VARK/MBTI
+    (déjà extraits, ex. par _normalize_labels) + features + contraintes UI.
     """
-    vark = profiles.get("VARK")
-    mbti = profiles.get("MBTI")
-
-    vark_label = vark.get("label") if isinstance(vark, dict) else vark
-    mbti_label = mbti.get("label") if isinstance(mbti, dict) else mbti
-
     ls = _vark_to_learning_style(vark_label or "R")
     pers = _mbti_to_personality(mbti_label or "INTJ")
 
-    # Hydratation avec features si présents
-    ls.visual = float(features.get("ls_visual", ls.visual))
-    ls.auditory = float(features.get("ls_auditory", ls.auditory))
-    ls.reading = float(features.get("ls_reading", ls.reading))
-    ls.kinesthetic = float(features.get("ls_kinesthetic", ls.kinesthetic))
-
-    pers.extraversion = float(features.get("pers_extraversion", pers.extraversion))
-    pers.intuition = float(features.get("pers_intuition", pers.intuition))
-    pers.thinking = float(features.get("pers_thinking", pers.thinking))
-    pers.judging = float(features.get("pers_judging", pers.judging))
+    # Hydratation avec features si présents (un seul get par clé, float() seulement sur les valeurs fournies)
+    for obj, overrides in ((ls, _LS_FEATURES), (pers, _PERS_FEATURES)):
+        for key, attr in overrides:
+            value = features.get(key)
+            if value is not None:
+                setattr(obj, attr, float(value))
 
     cog = CognitiveProfile()  # neutre, adaptable plus tard
     beh = BehavioralProfile()
@@ -321,14 +453,10 @@ def build_prompt_from_profiles(
         confidence_level=float(features.get("confidence", 0.6)),
     )
 
-    transformer = PromptTransformer()
-    prompt_text = transformer.profile_to_prompt(lp)
-    recs = transformer.generate_ui_recommendations(lp)
-
-    header = f"[BUT] {goal} | [LANG] {lang} | [NIVEAU] {level}"
-    ui_constraints = f"[UI CONSTRAINTS] {ui}"
+    prompt_text = _TRANSFORMER.profile_to_prompt(lp)
+    recs = _TRANSFORMER.generate_ui_recommendations(lp)
 
-    final_text = f"{header}\n{prompt_text}\n{ui_constraints}"
+    final_text = f"[BUT] {goal} | [LANG] {lang} | [NIVEAU] {level}\n{prompt_text}\n[UI CONSTRAINTS] {ui}"
 
     return {
         "text": final_text,
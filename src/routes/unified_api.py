@@ -1,43 +1,88 @@
 # src/routes/unified_api.py
 
+import functools
+import hashlib
+import importlib.util
 import json
+import logging
+import os
 import pathlib
 import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
 
-from flask import Blueprint, request, jsonify
-from jsonschema import validate, ValidationError
-from importlib.machinery import SourceFileLoader
+from flask import Blueprint, current_app, request, jsonify
+from jsonschema import Draft7Validator
+from jsonschema.exceptions import best_match
+from werkzeug.exceptions import HTTPException
+
+logger = logging.getLogger(__name__)
+
+# orjson si disponible (parsing des schémas, sérialisation des réponses), sinon json / jsonify
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None  # type: ignore
+    ORJSON_AVAILABLE = False
+
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
 
 # ================== DÉTECTION ROBUSTE DU PROJECT_ROOT ==================
 
 CURRENT = pathlib.Path(__file__).resolve()
 
-# On remonte et on cherche un dossier qui contient "integration_pack"
-PROJECT_ROOT = None
-for p in CURRENT.parents:
-    if (p / "integration_pack").exists():
-        PROJECT_ROOT = p
-        break
 
-if PROJECT_ROOT is None:
+@functools.cache
+def _find_project_root(start: pathlib.Path) -> pathlib.Path:
+    # On remonte et on cherche un dossier qui contient "integration_pack"
+    for p in start.parents:
+        if (p / "integration_pack").exists():
+            return p
     # Fallback: on suppose que le repo est deux niveaux au-dessus
-    PROJECT_ROOT = CURRENT.parents[2]
+    return start.parents[2]
+
+
+# Variable d'environnement PROJECT_ROOT prioritaire : aucun parcours du disque
+_ENV_ROOT = os.environ.get("PROJECT_ROOT")
+PROJECT_ROOT = pathlib.Path(_ENV_ROOT) if _ENV_ROOT else _find_project_root(CURRENT)
 
 PACK = PROJECT_ROOT / "integration_pack"
 SCHEMAS = PACK / "data_contracts"
 
 # ================== CHARGEMENT DES SCHÉMAS ==================
 
-SCHEMA_CONV = json.loads((SCHEMAS / "conversations.schema.json").read_text(encoding="utf-8"))
-SCHEMA_NLP = json.loads((SCHEMAS / "nlp_features.schema.json").read_text(encoding="utf-8"))
-SCHEMA_REC = json.loads((SCHEMAS / "recommendation.schema.json").read_text(encoding="utf-8"))
+SCHEMA_CONV = _json_loads((SCHEMAS / "conversations.schema.json").read_text(encoding="utf-8"))
+SCHEMA_NLP = _json_loads((SCHEMAS / "nlp_features.schema.json").read_text(encoding="utf-8"))
+SCHEMA_REC = _json_loads((SCHEMAS / "recommendation.schema.json").read_text(encoding="utf-8"))
+
+# Validateurs construits une fois (jsonschema.validate revérifie le schéma à chaque appel)
+for _schema in (SCHEMA_CONV, SCHEMA_NLP, SCHEMA_REC):
+    Draft7Validator.check_schema(_schema)
+VAL_CONV = Draft7Validator(SCHEMA_CONV)
+VAL_NLP = Draft7Validator(SCHEMA_NLP)
+VAL_REC = Draft7Validator(SCHEMA_REC)
 
 # ================== UI ADAPTER (depuis integration_pack) ==================
 
-ui_adapter = SourceFileLoader(
-    "ui_adapter",
-    str(PACK / "apps" / "gen" / "ui_adapter.py")
-).load_module()
+def _load_ui_adapter():
+    # Module mis en cache dans sys.modules : son code ne s'exécute qu'une fois par processus
+    module = sys.modules.get("ui_adapter")
+    if module is None:
+        spec = importlib.util.spec_from_file_location("ui_adapter", PACK / "apps" / "gen" / "ui_adapter.py")
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["ui_adapter"] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules["ui_adapter"]
+            raise
+    return module
+
+
+ui_adapter = _load_ui_adapter()
 ui_from_profile = ui_adapter.ui_from_profile
 
 # ================== IMPORTS VERS TON CODE ==================
@@ -74,12 +119,31 @@ except ImportError:
 DDL = (PACK / "feature_store" / "ddl.sql").read_text(encoding="utf-8")
 
 
-def init_db(db_path=str(PROJECT_ROOT / "feature_store.db")):
-    con = sqlite3.connect(db_path)
-    cur = con.cursor()
-    cur.executescript(DDL)
+DB_PATH = str(PROJECT_ROOT / "feature_store.db")
+
+# Une connexion par thread et par base, ouverte une fois puis réutilisée
+_DB_LOCAL = threading.local()
+
+
+def get_db(db_path=DB_PATH) -> sqlite3.Connection:
+    cons = getattr(_DB_LOCAL, "cons", None)
+    if cons is None:
+        cons = _DB_LOCAL.cons = {}
+    con = cons.get(db_path)
+    if con is None:
+        con = sqlite3.connect(db_path)
+        # WAL : lecteurs et écrivain concurrents ; NORMAL : pas de fsync à chaque commit
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        con.execute("PRAGMA temp_store=MEMORY")
+        cons[db_path] = con
+    return con
+
+
+def init_db(db_path=DB_PATH):
+    con = get_db(db_path)
+    con.executescript(DDL)
     con.commit()
-    con.close()
 
 
 init_db()
@@ -90,21 +154,88 @@ unified_bp = Blueprint("unified_api", __name__)
 
 # ================== UTILS ==================
 
-def validate_json(payload, schema):
-    try:
-        validate(payload, schema)
+def validate_json(payload, validator):
+    # best_match : même erreur rapportée que jsonschema.validate
+    error = best_match(validator.iter_errors(payload))
+    if error is None:
         return True, None
-    except ValidationError as e:
-        return False, f"Schema error: {e.message}"
+    return False, f"Schema error: {error.message}"
+
+
+def _json(obj, status=200):
+    """Réponse JSON ; clés triées et repli sur l'encodeur de Flask comme jsonify."""
+    if not ORJSON_AVAILABLE:
+        return jsonify(obj), status
+    body = orjson.dumps(
+        obj,
+        default=current_app.json.default,
+        option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+    )
+    return current_app.response_class(body, status=status, mimetype="application/json")
+
+
+# Cache LRU des réponses /recommend réussies (retries, doubles soumissions du front),
+# chaque entrée expirant après REC_CACHE_TTL_S secondes
+REC_CACHE_SIZE = 512
+REC_CACHE_TTL_S = 300.0
+_REC_CACHE: "OrderedDict[bytes, tuple]" = OrderedDict()
+_REC_CACHE_LOCK = threading.Lock()
+
+
+def _rec_cache_key(conv, context):
+    """Empreinte blake2b de (conversation, contexte) sérialisés à clés triées ; None si non sérialisable."""
+    try:
+        if ORJSON_AVAILABLE:
+            raw = orjson.dumps([conv, context], option=orjson.OPT_SORT_KEYS)
+        else:
+            raw = json.dumps([conv, context], sort_keys=True, ensure_ascii=False).encode("utf-8")
+    except (TypeError, ValueError):
+        return None
+    return hashlib.blake2b(raw, digest_size=16).digest()
+
+
+def _rec_cache_get(key):
+    if key is None:
+        return None
+    with _REC_CACHE_LOCK:
+        entry = _REC_CACHE.get(key)
+        if entry is None:
+            return None
+        expires, rec = entry
+        if time.monotonic() >= expires:
+            del _REC_CACHE[key]
+            return None
+        _REC_CACHE.move_to_end(key)
+        return rec
+
+
+def _rec_cache_put(key, rec):
+    if key is None:
+        return
+    # Config de repli (modèle indisponible) : pas mise en cache, la requête suivante retentera
+    ui_config = rec.get("content", {}).get("ui_config") or {}
+    if ui_config.get("metadata", {}).get("fallback"):
+        return
+    with _REC_CACHE_LOCK:
+        _REC_CACHE[key] = (time.monotonic() + REC_CACHE_TTL_S, rec)
+        _REC_CACHE.move_to_end(key)
+        if len(_REC_CACHE) > REC_CACHE_SIZE:
+            _REC_CACHE.popitem(last=False)
 
 
 def _extract_features_stub(conv: dict) -> dict:
-    turns = conv.get("turns", [])
-    texts = [t.get("text", "") for t in turns if isinstance(t, dict)]
-    n = max(1, len(texts))
+    # Un seul passage sur les tours, sans liste intermédiaire
+    n = total_len = questions = 0
+    for t in conv.get("turns", ()):
+        if isinstance(t, dict):
+            text = t.get("text", "")
+            n += 1
+            total_len += len(text)
+            questions += "?" in text
+    n = max(1, n)
     return {
-        "avg_turn_len": sum(len(t) for t in texts) / n,
-        "question_ratio": sum(1 for t in texts if "?" in t) / n,
+        "avg_turn_len": total_len / n,
+        "question_ratio": questions / n,
     }
 
 
@@ -126,7 +257,7 @@ def _normalize_labels(profiles: dict):
 
 
 def nlp_pipeline(conv: dict) -> dict:
-    ok, err = validate_json(conv, SCHEMA_CONV)
+    ok, err = validate_json(conv, VAL_CONV)
     if not ok:
         raise ValueError(err)
 
@@ -140,7 +271,7 @@ def nlp_pipeline(conv: dict) -> dict:
         "profiles": prof,
     }
 
-    ok, err = validate_json(out, SCHEMA_NLP)
+    ok, err = validate_json(out, VAL_NLP)
     if not ok:
         raise ValueError(err)
 
@@ -155,13 +286,14 @@ def profile():
     try:
         nlp_out = nlp_pipeline(conv)
         vark, mbti = _normalize_labels(nlp_out["profiles"])
-        return jsonify({
+        return _json({
             "VARK": vark,
             "MBTI": mbti,
             "scores": nlp_out["profiles"].get("scores", {})
         })
-    except Exception as e:
-        return jsonify({"error": str(e)}), 400
+    except ValueError as e:
+        # Entrée invalide (schéma) : 400 ; le reste remonte à _unexpected_error (500)
+        return _json({"error": str(e)}, 400)
 
 
 @unified_bp.post("/recommend")
@@ -169,6 +301,14 @@ def recommend():
     payload = request.get_json(force=True) or {}
     conv = payload.get("conversation", {})
     context = payload.get("context", {}) or {}
+    if not isinstance(context, dict):
+        return _json({"error": "Schema error: context must be an object"}, 400)
+
+    # Conversation + contexte déjà servis : réponse en cache, sans NLP ni génération
+    cache_key = _rec_cache_key(conv, context)
+    cached = _rec_cache_get(cache_key)
+    if cached is not None:
+        return _json(cached)
 
     try:
         # 1) NLP (features + profils)
@@ -183,7 +323,8 @@ def recommend():
             goal=context.get("goal", "Explain topic"),
             lang=context.get("lang", "fr"),
             level=context.get("level", "L3"),
-            profiles={"VARK": vark, "MBTI": mbti},
+            vark_label=vark,
+            mbti_label=mbti,
             features=nlp_out["features"],
             ui=ui
         )
@@ -198,11 +339,22 @@ def recommend():
             "content": content
         }
 
-        ok, err = validate_json(rec, SCHEMA_REC)
+        ok, err = validate_json(rec, VAL_REC)
         if not ok:
-            return jsonify({"error": err, "payload": rec}), 500
+            return _json({"error": err, "payload": rec}, 500)
+
+        _rec_cache_put(cache_key, rec)
+        return _json(rec)
+
+    except ValueError as e:
+        return _json({"error": str(e)}, 400)
 
-        return jsonify(rec)
 
-    except Exception as e:
-        return jsonify({"error": str(e)}), 400
+@unified_bp.errorhandler(Exception)
+def _unexpected_error(e):
+    # Erreurs HTTP (JSON illisible, méthode...) : réponse standard de werkzeug
+    if isinstance(e, HTTPException):
+        return e
+    # Bug côté serveur : journalisé une fois, sans détail interne dans la réponse
+    logger.exception("Erreur inattendue sur %s", request.path)
+    return _json({"error": "Internal server error"}, 500)